@@ -0,0 +1,41 @@
+"""
+Compara la cola de cubetas (Dial) con el montículo binario en Dijkstra
+
+Uso:
+    python -m benchmarks.bucket_queue [n_nodos] [n_aristas] [n_fuentes]
+"""
+import random
+import sys
+import time
+
+from sim.csr_graph import CSRGraph, dijkstra_csr
+from sim.init_simulation import SimulationInitializer
+
+
+def run(n_nodes=20000, m_edges=60000, n_sources=20, seed=42):
+    """Ejecuta ambas colas desde las mismas fuentes y verifica que coincidan"""
+    random.seed(seed)
+    graph = SimulationInitializer.create_connected_graph(n_nodes, m_edges, seed=seed)
+    csr = CSRGraph.from_graph(graph)
+    sources = random.sample(range(len(csr)), n_sources)
+
+    timings = {}
+    results = {}
+    for queue in ('heap', 'bucket'):
+        started = time.perf_counter()
+        results[queue] = [dijkstra_csr(csr, source, queue=queue) for source in sources]
+        timings[queue] = time.perf_counter() - started
+
+    for (heap_dist, heap_pred), (bucket_dist, bucket_pred) in zip(results['heap'], results['bucket']):
+        if heap_dist != bucket_dist or heap_pred != bucket_pred:
+            raise AssertionError("La cola de cubetas produjo un resultado distinto")
+
+    print(f"Grafo: {len(csr)} nodos, {csr.num_arcs()} arcos, peso máximo {csr.int_weight_bound}")
+    for queue, seconds in timings.items():
+        print(f"{queue:>6}: {seconds:.3f} s ({seconds / n_sources * 1000:.2f} ms por fuente)")
+    print(f"Aceleración: {timings['heap'] / timings['bucket']:.2f}x")
+    return timings
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:4]))
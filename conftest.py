@@ -0,0 +1,2 @@
+# Permite que pytest importe los paquetes del proyecto (sim, model, tda, ...)
+# desde la raíz del repositorio
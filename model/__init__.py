@@ -1,3 +1,4 @@
 from .graph_base import Graph
 from .vertex_base import Vertex
-from .edge_base import Edge
\ No newline at end of file
+from .edge_base import Edge
+from .graph_change import GraphChange
@@ -1,39 +1,149 @@
 from .vertex_base import Vertex
 from .edge_base import Edge
+from .graph_change import GraphChange
+from . import traversal
+from tda.indexed_set import IndexedSet
 
 class Graph:
-    def __init__(self, directed=False):
-        """Inicializa el grafo como dirigido o no dirigido."""
+    JOURNAL_LIMIT = 10000  # Máximo de cambios retenidos en el historial (por defecto)
+
+    def __init__(self, directed=False, journal_limit=JOURNAL_LIMIT):
+        """
+        Inicializa el grafo como dirigido o no dirigido.
+
+        journal_limit es el máximo de cambios retenidos para changes_since
+        (0 desactiva el historial). El historial solo se llena desde la primera
+        llamada a track_changes o changes_since, así que sin consumidores
+        no cuesta memoria.
+        """
         self._outgoing = {}        # Diccionario: vértice -> adyacentes
         self._incoming = {} if directed else self._outgoing
         self._directed = directed  # Tipo de grafo: True si es dirigido
         self.node_types = {}  # Diccionario para almacenar tipos de nodos
+        self._by_type = {}    # Índice: tipo de nodo -> IndexedSet de vértices
+        self._vertex_by_id = []  # Registro: id -> vértice (None si el id está libre)
+        self._free_ids = []      # Ids liberados, se reutilizan para mantenerlos densos
+        self.version = 0      # Se incrementa con cada modificación del grafo
+        self._listeners = []  # Funciones notificadas con cada GraphChange
+        self._journal = []    # Historial de GraphChange en orden de versión
+        self.journal_limit = journal_limit
+        self._journal_active = False  # Se activa con el primer changes_since
+        self._edges = {}      # Registro de aristas: id(Edge) -> Edge (orden de inserción)
 
     def is_directed(self):
         """Indica si el grafo es dirigido."""
         return self._directed
 
-    def insert_vertex(self, element, node_type='client'):
-        """Crea un nuevo vértice con tipo específico"""
-        v = Vertex(element)
+    def subscribe(self, callback):
+        """Registra una función que recibirá un GraphChange por cada modificación."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """Elimina una función registrada con subscribe."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _record(self, kind, u, v=None, weight=None, old_weight=None):
+        """Incrementa la versión, anota el cambio y lo notifica a los suscriptores."""
+        self.version += 1
+        change = GraphChange(self.version, kind, u, v, weight, old_weight)
+        if self._journal_active:
+            self._journal.append(change)
+            if len(self._journal) > self.journal_limit:
+                # Se descarta la mitad más antigua para que el recorte sea amortizado
+                del self._journal[:len(self._journal) - self.journal_limit // 2]
+        for callback in list(self._listeners):
+            callback(change)
+
+    def track_changes(self):
+        """Empieza a guardar el historial para changes_since (desde la versión actual)."""
+        self._journal_active = self.journal_limit > 0
+
+    def changes_since(self, version):
+        """
+        Retorna los cambios posteriores a la versión dada, en orden.
+        Retorna None si parte de ese historial ya fue descartado; en ese caso
+        el consumidor debe reconstruir su estado desde cero.
+        """
+        self.track_changes()
+        if version >= self.version:
+            return []
+        if not self._journal or version < self._journal[0].version - 1:
+            return None
+        return self._journal[version - self._journal[0].version + 1:]
+
+    def _add_vertex(self, element, node_type):
+        """Crea el vértice con un id libre y lo registra en los índices."""
+        if self._free_ids:
+            vid = self._free_ids.pop()
+            v = Vertex(element, vid)
+            self._vertex_by_id[vid] = v
+        else:
+            v = Vertex(element, len(self._vertex_by_id))
+            self._vertex_by_id.append(v)
         self._outgoing[v] = {}
         if self._directed:
             self._incoming[v] = {}
         self.node_types[v] = node_type  # Almacena el tipo de nodo
+        self._by_type.setdefault(node_type, IndexedSet()).add(v)
+        return v
+
+    def insert_vertex(self, element, node_type='client'):
+        """Crea un nuevo vértice con tipo específico"""
+        v = self._add_vertex(element, node_type)
+        self._record(GraphChange.INSERT_VERTEX, v)
         return v
 
     def insert_edge(self, u, v, element):
         """Crea y agrega una arista entre dos vértices dados."""
+        old = self._outgoing[u].get(v)
         e = Edge(u, v, element)
         self._outgoing[u][v] = e   # Agrega arista a salidas
         self._incoming[v][u] = e   # Agrega arista a entradas
+        if old is not None:
+            del self._edges[id(old)]
+        self._edges[id(e)] = e
+        if old is None:
+            self._record(GraphChange.INSERT_EDGE, u, v, element)
+        else:
+            self._record(GraphChange.REWEIGHT_EDGE, u, v, element, old.element())
         return e
 
+    def insert_vertices(self, elements, node_types=None):
+        """
+        Inserta muchos vértices registrando un solo cambio BULK_UPDATE.
+        node_types es una secuencia paralela a elements (None = todos 'client').
+        """
+        if node_types is None:
+            node_types = ['client'] * len(elements)
+        vertices = [self._add_vertex(element, node_type)
+                    for element, node_type in zip(elements, node_types)]
+        self._record(GraphChange.BULK_UPDATE, None)
+        return vertices
+
+    def insert_edges(self, edges):
+        """
+        Inserta muchas aristas (tuplas u, v, peso) registrando un solo cambio
+        BULK_UPDATE en lugar de uno por arista.
+        """
+        outgoing, incoming, registry = self._outgoing, self._incoming, self._edges
+        for u, v, element in edges:
+            old = outgoing[u].get(v)
+            if old is not None:
+                del registry[id(old)]
+            e = Edge(u, v, element)
+            outgoing[u][v] = e
+            incoming[v][u] = e
+            registry[id(e)] = e
+        self._record(GraphChange.BULK_UPDATE, None)
+
     def remove_edge(self, u, v):
         """Elimina la arista entre u y v, si existe."""
         if u in self._outgoing and v in self._outgoing[u]:
-            del self._outgoing[u][v]
+            e = self._outgoing[u].pop(v)
             del self._incoming[v][u]
+            del self._edges[id(e)]
+            self._record(GraphChange.REMOVE_EDGE, u, v, None, e.element())
 
     def remove_vertex(self, v):
         """Elimina un vértice y todas sus aristas incidentes."""
@@ -41,9 +151,27 @@ class Graph:
             self.remove_edge(v, u)
         for u in list(self._incoming.get(v, {})):
             self.remove_edge(u, v)
-        self._outgoing.pop(v, None)
+        if v not in self._outgoing:
+            return
+        self._outgoing.pop(v)
         if self._directed:
             self._incoming.pop(v, None)
+        self._vertex_by_id[v.id()] = None
+        self._free_ids.append(v.id())
+        node_type = self.node_types.pop(v, 'client')
+        if node_type in self._by_type:
+            self._by_type[node_type].discard(v)
+        self._record(GraphChange.REMOVE_VERTEX, v)
+
+    def vertex_by_id(self, vid):
+        """Retorna el vértice con el id dado, o None si el id está libre."""
+        if 0 <= vid < len(self._vertex_by_id):
+            return self._vertex_by_id[vid]
+        return None
+
+    def id_capacity(self):
+        """Cota superior (exclusiva) de los ids; sirve para dimensionar arreglos."""
+        return len(self._vertex_by_id)
 
     def get_edge(self, u, v):
         """Retorna la arista desde u hasta v, o None si no existe."""
@@ -54,11 +182,16 @@ class Graph:
         return self._outgoing.keys()
 
     def edges(self):
-        """Retorna todas las aristas del grafo."""
-        seen = set()
-        for adj_map in self._outgoing.values():
-            seen.update(adj_map.values())
-        return seen
+        """Retorna todas las aristas del grafo (vista del registro, sin copiarlo)."""
+        return self._edges.values()
+
+    def num_vertices(self):
+        """Retorna la cantidad de vértices del grafo."""
+        return len(self._outgoing)
+
+    def num_edges(self):
+        """Retorna la cantidad de aristas del grafo."""
+        return len(self._edges)
 
     def neighbors(self, v):
         """Retorna los vecinos del vértice v."""
@@ -74,51 +207,28 @@ class Graph:
         adj = self._outgoing if outgoing else self._incoming
         return adj[v].values()
 
-    def dfs(self, start, visited=None):
-        """Recorrido en profundidad (DFS) desde el vértice dado."""
-        if visited is None:
-            visited = set()
-        visited.add(start)
-        yield start
-        for neighbor in self.neighbors(start):
-            if neighbor not in visited:
-                yield from self.dfs(neighbor, visited)
-
-    def bfs(self, start):
+    def dfs(self, start, visited=None, max_depth=None, stop=None):
+        """Recorrido en profundidad (DFS) iterativo desde el vértice dado."""
+        return traversal.dfs(self, start, visited, max_depth, stop)
+
+    def bfs(self, start, visited=None, max_depth=None, stop=None):
         """Recorrido en anchura (BFS) desde el vértice dado."""
-        visited = set()
-        queue = [start]
-        visited.add(start)
-        while queue:
-            v = queue.pop(0)
-            yield v
-            for neighbor in self.neighbors(v):
-                if neighbor not in visited:
-                    visited.add(v)
-                    queue.append(v)
+        return traversal.bfs(self, start, visited, max_depth, stop)
 
     def topological_sort(self):
         """Ordenamiento topológico de un grafo dirigido acíclico."""
-        in_degree = {v: 0 for v in self.vertices()}
-        for u in self.vertices():
-            for v in self.neighbors(u):
-                in_degree[v] += 1
-
-        queue = [v for v in self.vertices() if in_degree[v] == 0]
-        result = []
-
-        while queue:
-            u = queue.pop(0)
-            result.append(u)
-            for v in self.neighbors(u):
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
-
-        if len(result) != len(in_degree):
-            raise ValueError("Graph has a cycle. Topological sort not possible.")
-        return result
-
+        return traversal.topological_sort(self)
+
+    def vertices_by_type(self, node_type):
+        """
+        Retorna los vértices de un tipo como IndexedSet (pertenencia y
+        random_choice en O(1)). Es el índice interno: no debe modificarse.
+        """
+        return self._by_type.get(node_type) or IndexedSet()
+
+    def count_by_type(self):
+        """Retorna un diccionario {tipo: cantidad de vértices}."""
+        return {t: len(vs) for t, vs in self._by_type.items() if len(vs)}
 
     def get_node_type(self, vertex):
         """Devuelve el tipo de nodo (almacen, recarga, cliente)"""
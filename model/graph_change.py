@@ -0,0 +1,25 @@
+class GraphChange:
+    """Registro de una modificación del grafo, enviado a los suscriptores."""
+    __slots__ = 'version', 'kind', 'u', 'v', 'weight', 'old_weight'
+
+    # Tipos de cambio posibles
+    INSERT_VERTEX = 'insert_vertex'
+    REMOVE_VERTEX = 'remove_vertex'
+    INSERT_EDGE = 'insert_edge'
+    REMOVE_EDGE = 'remove_edge'
+    REWEIGHT_EDGE = 'reweight_edge'
+    BULK_UPDATE = 'bulk_update'  # Carga masiva: los consumidores deben reconstruir su estado
+
+    def __init__(self, version, kind, u, v=None, weight=None, old_weight=None):
+        """Inicializa el cambio; v y los pesos solo aplican a aristas."""
+        self.version = version        # Versión del grafo tras aplicar el cambio
+        self.kind = kind              # Tipo de cambio
+        self.u = u                    # Vértice (o extremo de origen de la arista)
+        self.v = v                    # Extremo de destino de la arista
+        self.weight = weight          # Peso nuevo de la arista
+        self.old_weight = old_weight  # Peso anterior (solo en reweight_edge y remove_edge)
+
+    def __repr__(self):
+        """Representación oficial del cambio."""
+        return (f"GraphChange({self.version}, {self.kind}, {self.u}, {self.v}, "
+                f"{self.weight}, {self.old_weight})")
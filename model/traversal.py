@@ -0,0 +1,131 @@
+from collections import deque
+
+
+class VisitedSet:
+    """
+    Conjunto de vértices visitados sobre un bitset indexado por el id del vértice
+
+    Recuerda qué posiciones marcó, así clear() cuesta lo visitado y no el
+    tamaño del grafo; un mismo VisitedSet puede reutilizarse entre recorridos.
+    """
+
+    def __init__(self, capacity=0):
+        self._bits = bytearray(capacity)
+        self._touched = []
+
+    def add(self, v):
+        vid = v.id()
+        if vid < 0:
+            raise ValueError(f"{v!r} no pertenece a un grafo (sin id)")
+        if vid >= len(self._bits):
+            self._bits.extend(bytearray(max(vid + 1, 2 * len(self._bits)) - len(self._bits)))
+        if not self._bits[vid]:
+            self._bits[vid] = 1
+            self._touched.append(vid)
+
+    def __contains__(self, v):
+        vid = v.id()
+        return 0 <= vid < len(self._bits) and self._bits[vid] == 1
+
+    def __len__(self):
+        return len(self._touched)
+
+    def clear(self):
+        for vid in self._touched:
+            self._bits[vid] = 0
+        self._touched = []
+
+
+def _visited_for(graph, visited):
+    """Usa el conjunto entregado o crea un bitset del tamaño del grafo"""
+    if visited is None:
+        return VisitedSet(graph.id_capacity())
+    return visited
+
+
+def bfs_depths(graph, start, visited=None, max_depth=None, stop=None):
+    """
+    Recorrido en anchura que genera tuplas (vértice, profundidad)
+
+    Args:
+        graph: Grafo a recorrer
+        start: Vértice inicial
+        visited: Conjunto de visitados a reutilizar (VisitedSet o set)
+        max_depth: No se expanden vértices a esta profundidad (None = sin límite)
+        stop: Predicado; el recorrido termina tras generar un vértice que lo cumple
+    """
+    visited = _visited_for(graph, visited)
+    visited.add(start)
+    queue = deque([(start, 0)])
+    while queue:
+        v, depth = queue.popleft()
+        yield v, depth
+        if stop is not None and stop(v):
+            return
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for neighbor in graph.neighbors(v):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append((neighbor, depth + 1))
+
+
+def bfs(graph, start, visited=None, max_depth=None, stop=None):
+    """Recorrido en anchura; genera los vértices en orden de visita"""
+    for v, _ in bfs_depths(graph, start, visited, max_depth, stop):
+        yield v
+
+
+def dfs(graph, start, visited=None, max_depth=None, stop=None):
+    """
+    Recorrido en profundidad con pila explícita (sin límite de recursión)
+
+    Visita los vértices en el mismo orden que la versión recursiva. Los
+    argumentos tienen el mismo significado que en bfs_depths.
+    """
+    visited = _visited_for(graph, visited)
+    visited.add(start)
+    yield start
+    if stop is not None and stop(start):
+        return
+    if max_depth is not None and max_depth <= 0:
+        return
+    # Pila de iteradores de vecinos, uno por nivel de profundidad
+    stack = [iter(graph.neighbors(start))]
+    while stack:
+        neighbor = next(stack[-1], None)
+        if neighbor is None:
+            stack.pop()
+            continue
+        if neighbor in visited:
+            continue
+        visited.add(neighbor)
+        yield neighbor
+        if stop is not None and stop(neighbor):
+            return
+        if max_depth is None or len(stack) < max_depth:
+            stack.append(iter(graph.neighbors(neighbor)))
+
+
+def topological_sort(graph):
+    """Ordenamiento topológico (Kahn) de un grafo dirigido acíclico"""
+    # Grados de entrada indexados por el id de cada vértice
+    in_degree = [0] * graph.id_capacity()
+    for u in graph.vertices():
+        for v in graph.neighbors(u):
+            in_degree[v.id()] += 1
+
+    queue = deque(v for v in graph.vertices() if in_degree[v.id()] == 0)
+    result = []
+
+    while queue:
+        u = queue.popleft()
+        result.append(u)
+        for v in graph.neighbors(u):
+            in_degree[v.id()] -= 1
+            if in_degree[v.id()] == 0:
+                queue.append(v)
+
+    if len(result) != graph.num_vertices():
+        raise ValueError("Graph has a cycle. Topological sort not possible.")
+    return result
@@ -1,18 +1,25 @@
 class Vertex:
     """Clase que representa un vértice (nodo) en un grafo."""
-    __slots__ = '_element'
+    __slots__ = '_element', '_id'
 
-    def __init__(self, element):
-        """Inicializa el vértice con el elemento dado."""
+    def __init__(self, element, id=-1):
+        """Inicializa el vértice con el elemento dado y su id entero en el grafo."""
         self._element = element  # Asignar el valor del elemento recibido
+        self._id = id            # Id denso asignado por Graph (-1 si no pertenece a uno)
 
     def element(self):
         """Devuelve el elemento asociado a este vértice."""
         return self._element  # Retornar el valor almacenado en _element
 
+    def id(self):
+        """Devuelve el id entero del vértice dentro de su grafo."""
+        return self._id
+
     def __hash__(self):
         """Permite usar el vértice como clave en diccionarios o sets."""
-        return hash(self._element)  # Usar id(self) para generar un hash único
+        if self._id >= 0:
+            return self._id  # Hash entero: más barato que hashear el elemento
+        return hash(self._element)
 
     def __str__(self):
         """Devuelve la representación en string del vértice (su contenido)."""
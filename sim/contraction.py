@@ -0,0 +1,262 @@
+import heapq
+import time
+from array import array
+from math import inf
+from typing import Dict, List, Optional, Tuple
+
+from sim.csr_graph import CSRGraph
+
+
+class ContractionHierarchy:
+    """
+    Jerarquía de contracción (CH) sobre una instantánea CSR no dirigida
+
+    El preprocesamiento contrae los nodos de menor a mayor importancia y
+    agrega atajos (shortcuts) para conservar las distancias. Cada nodo guarda
+    solo sus aristas hacia nodos más importantes (grafo "hacia arriba"); una
+    consulta es una búsqueda bidireccional que solo sube en la jerarquía.
+    """
+
+    def __init__(self, csr: CSRGraph, witness_settle_limit=50):
+        """
+        Args:
+            csr: Instantánea del grafo (debe ser no dirigido)
+            witness_settle_limit: Máximo de nodos asentados por búsqueda de testigos
+        """
+        if csr.directed:
+            raise ValueError("La jerarquía de contracción solo admite grafos no dirigidos")
+
+        self.csr = csr
+        self.witness_settle_limit = witness_settle_limit
+        self.rank = array('q', [0]) * len(csr)
+        self.shortcut_count = 0
+        self.preprocessing_seconds = 0.0
+
+        started = time.perf_counter()
+        self._contract_all()
+        self.preprocessing_seconds = time.perf_counter() - started
+
+    # ---------- Preprocesamiento ----------
+
+    def _contract_all(self):
+        """Ordena y contrae todos los nodos, construyendo el grafo hacia arriba"""
+        n = len(self.csr)
+        indptr, indend = self.csr.indptr, self.csr.indend
+        indices, weights = self.csr.indices, self.csr.weights
+
+        # Grafo restante: nodo -> {vecino: (peso, nodo_medio)}; -1 = arista original
+        adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for k in range(indptr[u], indend[u]):
+                v = indices[k]
+                w = weights[k]
+                if v != u and (v not in adj[u] or w < adj[u][v][0]):
+                    adj[u][v] = (w, -1)
+
+        contracted = bytearray(n)
+        deleted_neighbors = array('q', [0]) * n
+        up = [None] * n
+
+        pq = [(self._priority(adj, v, deleted_neighbors), v) for v in range(n)]
+        heapq.heapify(pq)
+
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+
+            # Actualización perezosa: si la prioridad empeoró, reinsertar
+            priority = self._priority(adj, v, deleted_neighbors)
+            if pq and priority > pq[0][0]:
+                heapq.heappush(pq, (priority, v))
+                continue
+
+            up[v] = [(u, w, mid) for u, (w, mid) in adj[v].items()]
+            for (a, b), weight in self._shortcuts(adj, v).items():
+                adj[a][b] = (weight, v)
+                adj[b][a] = (weight, v)
+                self.shortcut_count += 1
+
+            for u in adj[v]:
+                del adj[u][v]
+                deleted_neighbors[u] += 1
+            adj[v] = {}
+            contracted[v] = 1
+            self.rank[v] = order
+            order += 1
+
+        self._build_upward_csr(up)
+
+    def _priority(self, adj, v, deleted_neighbors) -> int:
+        """Diferencia de aristas más vecinos ya contraídos"""
+        return len(self._shortcuts(adj, v)) - len(adj[v]) + deleted_neighbors[v]
+
+    def _shortcuts(self, adj, v) -> Dict[Tuple[int, int], float]:
+        """
+        Atajos necesarios al contraer v
+
+        Returns:
+            Diccionario {(u, w): peso} con u < w
+        """
+        neighbors = list(adj[v].items())
+        shortcuts = {}
+        for u, (w_uv, _) in neighbors:
+            targets = {w: w_uv + w_vw for w, (w_vw, _) in neighbors if w > u}
+            if not targets:
+                continue
+            witness = self._witness_search(adj, u, v, targets)
+            for w, via in targets.items():
+                if witness.get(w, inf) > via:
+                    shortcuts[(u, w)] = via
+        return shortcuts
+
+    def _witness_search(self, adj, source, excluded, targets) -> Dict[int, float]:
+        """
+        Dijkstra acotado desde source que ignora el nodo excluded
+
+        Se detiene al asentar todos los destinos, al superar la mayor distancia
+        vía excluded o al alcanzar el límite de nodos asentados.
+        """
+        max_dist = max(targets.values())
+        pending = len(targets)
+        dist = {source: 0.0}
+        pq = [(0.0, source)]
+        settled = 0
+        while pq and settled < self.witness_settle_limit:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            if d > max_dist:
+                break
+            if u in targets:
+                pending -= 1
+                if pending == 0:
+                    break
+            settled += 1
+            for v, (w, _) in adj[u].items():
+                if v == excluded:
+                    continue
+                nd = d + w
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+        return dist
+
+    def _build_upward_csr(self, up):
+        """Compacta las aristas hacia arriba en buffers CSR"""
+        self.up_indptr = array('q', [0])
+        self.up_indices = array('q')
+        self.up_weights = array('d')
+        self.up_middle = array('q')
+        for edges in up:
+            for u, w, mid in edges:
+                self.up_indices.append(u)
+                self.up_weights.append(w)
+                self.up_middle.append(mid)
+            self.up_indptr.append(len(self.up_indices))
+
+    # ---------- Consultas ----------
+
+    def query(self, source: int, target: int) -> Optional[Tuple[List[int], float]]:
+        """
+        Búsqueda bidireccional hacia arriba entre source y target
+
+        Returns:
+            Tupla (path en índices del CSR original, distancia) o None
+        """
+        if source == target:
+            return [source], 0.0
+
+        indptr, indices, weights = self.up_indptr, self.up_indices, self.up_weights
+        dist = ({source: 0.0}, {target: 0.0})
+        # nodo -> (predecesor, posición del arco en el grafo hacia arriba)
+        pred = ({source: (-1, -1)}, {target: (-1, -1)})
+        pqs = ([(0.0, source)], [(0.0, target)])
+        mu = inf
+        meeting = -1
+
+        while (pqs[0] and pqs[0][0][0] < mu) or (pqs[1] and pqs[1][0][0] < mu):
+            for side in (0, 1):
+                pq = pqs[side]
+                if not pq or pq[0][0] >= mu:
+                    continue
+                d, u = heapq.heappop(pq)
+                this_dist = dist[side]
+                if d > this_dist[u]:
+                    continue
+
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < mu:
+                    mu = d + other
+                    meeting = u
+
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    nd = d + weights[k]
+                    if nd < this_dist.get(v, inf):
+                        this_dist[v] = nd
+                        pred[side][v] = (u, k)
+                        heapq.heappush(pq, (nd, v))
+
+        if meeting == -1:
+            return None
+
+        # Arcos (u, v, k) desde source hasta meeting y desde meeting hasta target
+        forward = []
+        node = meeting
+        while pred[0][node][0] != -1:
+            u, k = pred[0][node]
+            forward.append((u, node, k))
+            node = u
+        forward.reverse()
+
+        backward = []
+        node = meeting
+        while pred[1][node][0] != -1:
+            u, k = pred[1][node]
+            backward.append((node, u, k))
+            node = u
+
+        path = [source]
+        for a, b, k in forward + backward:
+            path.extend(self._unpack(a, b, k)[1:])
+        return path, mu
+
+    def _unpack(self, a: int, b: int, k: int) -> List[int]:
+        """Expande el arco k (entre a y b) a la secuencia de nodos originales"""
+        path = [a]
+        stack = [(a, b, self.up_middle[k])]
+        while stack:
+            x, y, mid = stack.pop()
+            if mid == -1:
+                path.append(y)
+                continue
+            # Las aristas x-mid y mid-y están en el grafo hacia arriba de mid
+            stack.append((mid, y, self._middle_of(mid, y)))
+            stack.append((x, mid, self._middle_of(mid, x)))
+        return path
+
+    def _middle_of(self, low: int, high: int) -> int:
+        """Nodo medio del arco hacia arriba low -> high (-1 si es arista original)"""
+        for k in range(self.up_indptr[low], self.up_indptr[low + 1]):
+            if self.up_indices[k] == high:
+                return self.up_middle[k]
+        raise KeyError((low, high))
+
+    # ---------- Estadísticas ----------
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por el grafo hacia arriba y el orden de nodos"""
+        return sum(buf.itemsize * len(buf) for buf in (
+            self.rank, self.up_indptr, self.up_indices, self.up_weights, self.up_middle))
+
+    def stats(self) -> Dict:
+        """Resumen del preprocesamiento"""
+        return {
+            "nodes": len(self.csr),
+            "shortcuts": self.shortcut_count,
+            "upward_arcs": len(self.up_indices),
+            "preprocessing_seconds": self.preprocessing_seconds,
+            "memory_bytes": self.memory_bytes(),
+        }
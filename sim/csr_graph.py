@@ -0,0 +1,615 @@
+import heapq
+from array import array
+from math import inf, sin, cos, asin, sqrt, radians
+from typing import List, Optional, Tuple
+
+
+class CSRGraph:
+    """
+    Instantánea compacta de un Graph en formato CSR (Compressed Sparse Row).
+
+    Los vértices se numeran con enteros 0..n-1 y las listas de adyacencia se
+    guardan en buffers planos:
+        indptr[i]..indend[i]    -> rango de arcos salientes del nodo i
+        indices[k]              -> nodo destino del arco k
+        weights[k]              -> peso del arco k
+
+    Cada fila tiene además una capacidad (rowcap[i]) para admitir cambios
+    incrementales: los arcos nuevos usan el espacio libre de la fila y, si no
+    queda, la fila se reubica al final de los buffers con el doble de espacio.
+    """
+    __slots__ = ('vertices', 'index', 'indptr', 'indend', 'rowcap', 'indices', 'weights',
+                 'directed', 'arcs', 'wasted', 'int_weight_bound')
+
+    # Mayor peso entero con el que conviene la cola de cubetas (Dial)
+    BUCKET_MAX_WEIGHT = 64
+
+    def __init__(self, vertices, indptr, indices, weights, directed=False, index=None,
+                 indend=None, rowcap=None, int_weight_bound=None):
+        """
+        Args:
+            vertices: Lista índice -> Vertex
+            indptr: Inicio de cada fila; en formato compacto (largo n+1) también
+                define los finales si no se entrega indend
+            indices, weights: Buffers de arcos
+            directed: Si el grafo original es dirigido
+            index: Diccionario Vertex -> índice (se calcula si no se entrega)
+            indend, rowcap: Final y capacidad de cada fila
+            int_weight_bound: Cota de pesos enteros ya calculada (se calcula si es None)
+        """
+        self.vertices = vertices  # índice -> Vertex (None si el vértice fue eliminado)
+        self.index = index if index is not None else {v: i for i, v in enumerate(vertices)}
+        self.indptr = indptr
+        self.indend = indend if indend is not None else array('q', indptr[1:])
+        self.rowcap = rowcap if rowcap is not None else array('q', self.indend)
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+        self.arcs = sum(self.indend[i] - indptr[i] for i in range(len(vertices)))
+        self.wasted = len(indices) - self.arcs  # Espacio fuera de uso en los buffers
+        # Cota de los pesos si todos son enteros pequeños no negativos, o -1
+        self.int_weight_bound = 0
+        if int_weight_bound is not None:
+            self.int_weight_bound = int_weight_bound
+            return
+        for i in range(len(vertices)):
+            for k in range(indptr[i], self.indend[i]):
+                self._track_weight(weights[k])
+
+    def _track_weight(self, weight):
+        """Actualiza int_weight_bound con un peso nuevo"""
+        if self.int_weight_bound == -1:
+            return
+        if 0 <= weight <= self.BUCKET_MAX_WEIGHT and weight == int(weight):
+            self.int_weight_bound = max(self.int_weight_bound, int(weight))
+        else:
+            self.int_weight_bound = -1
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Construye la instantánea recorriendo las aristas incidentes de cada vértice"""
+        vertices = list(graph.vertices())
+        index = {v: i for i, v in enumerate(vertices)}
+
+        indptr = array('q', [0])
+        indices = array('q')
+        weights = array('d')
+
+        for v in vertices:
+            # En grafos no dirigidos cada arista aparece en ambos extremos
+            for edge in graph.incident_edges(v):
+                indices.append(index[edge.opposite(v)])
+                weights.append(edge.element())
+            indptr.append(len(indices))
+
+        return cls(vertices, indptr, indices, weights, graph.is_directed(), index)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def num_arcs(self) -> int:
+        """Número de arcos almacenados (2 por arista en grafos no dirigidos)"""
+        return self.arcs
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por los buffers CSR"""
+        return sum(buf.itemsize * len(buf) for buf in (
+            self.indptr, self.indend, self.rowcap, self.indices, self.weights))
+
+    # ---------- Cambios incrementales ----------
+
+    def add_vertex(self, vertex) -> int:
+        """Agrega un vértice sin arcos y retorna su índice"""
+        i = len(self.vertices)
+        self.vertices.append(vertex)
+        self.index[vertex] = i
+        start = len(self.indices)
+        self.indptr[i] = start
+        self.indptr.append(start)  # Centinela del formato compacto
+        self.indend.append(start)
+        self.rowcap.append(start)
+        return i
+
+    def remove_vertex(self, vertex) -> Optional[int]:
+        """Marca como eliminado el vértice (sus arcos salientes se descartan)"""
+        i = self.index.pop(vertex, None)
+        if i is None:
+            return None
+        self.arcs -= self.indend[i] - self.indptr[i]
+        self.wasted += self.indend[i] - self.indptr[i]
+        self.indend[i] = self.indptr[i]
+        self.vertices[i] = None
+        return i
+
+    def find_arc(self, u: int, v: int) -> int:
+        """Posición del arco u -> v en los buffers, o -1 si no existe"""
+        indices = self.indices
+        for k in range(self.indptr[u], self.indend[u]):
+            if indices[k] == v:
+                return k
+        return -1
+
+    def set_arc(self, u: int, v: int, weight: float):
+        """Inserta el arco u -> v o actualiza su peso"""
+        self._track_weight(weight)
+        k = self.find_arc(u, v)
+        if k != -1:
+            self.weights[k] = weight
+            return
+
+        if self.indend[u] == self.rowcap[u]:
+            self._relocate_row(u)
+        k = self.indend[u]
+        self.indices[k] = v
+        self.weights[k] = weight
+        self.indend[u] = k + 1
+        self.arcs += 1
+        self.wasted -= 1
+
+    def remove_arc(self, u: int, v: int) -> bool:
+        """Elimina el arco u -> v moviendo el último arco de la fila a su lugar"""
+        k = self.find_arc(u, v)
+        if k == -1:
+            return False
+        last = self.indend[u] - 1
+        self.indices[k] = self.indices[last]
+        self.weights[k] = self.weights[last]
+        self.indend[u] = last
+        self.arcs -= 1
+        self.wasted += 1
+        return True
+
+    def _relocate_row(self, u: int):
+        """Mueve la fila u al final de los buffers duplicando su capacidad"""
+        start, end = self.indptr[u], self.indend[u]
+        size = end - start
+        capacity = max(4, 2 * size)
+        new_start = len(self.indices)
+        self.indices.extend(self.indices[start:end])
+        self.weights.extend(self.weights[start:end])
+        self.indices.extend(array('q', [0]) * (capacity - size))
+        self.weights.extend(array('d', [0.0]) * (capacity - size))
+        # La fila anterior queda completa fuera de uso y la nueva trae holgura
+        self.wasted += capacity
+        self.indptr[u] = new_start
+        self.indend[u] = new_start + size
+        self.rowcap[u] = new_start + capacity
+
+    def has_removed(self) -> bool:
+        """Indica si quedan posiciones de vértices eliminados (vertices[i] es None)"""
+        return len(self.index) != len(self.vertices)
+
+    def compacted(self):
+        """
+        Copia compacta: sin holguras ni posiciones de vértices eliminados
+
+        Si había vértices eliminados los vivos se renumeran en orden, así que
+        los índices de la copia no coinciden con los de esta instantánea.
+        """
+        live = [u for u, v in enumerate(self.vertices) if v is not None]
+        renumber = None
+        if len(live) != len(self.vertices):
+            renumber = array('q', [-1]) * len(self.vertices)
+            for new, old in enumerate(live):
+                renumber[old] = new
+
+        vertices = [self.vertices[u] for u in live]
+        indptr = array('q', [0])
+        indices = array('q')
+        weights = array('d')
+        for u in live:
+            start, end = self.indptr[u], self.indend[u]
+            if renumber is None:
+                indices.extend(self.indices[start:end])
+            else:
+                indices.extend(renumber[v] for v in self.indices[start:end])
+            weights.extend(self.weights[start:end])
+            indptr.append(len(indices))
+        index = None if renumber is not None else dict(self.index)
+        return CSRGraph(vertices, indptr, indices, weights, self.directed, index,
+                        int_weight_bound=self.int_weight_bound)
+
+    def reverse(self):
+        """
+        Retorna la instantánea con los arcos invertidos (para búsquedas hacia atrás)
+
+        En grafos no dirigidos la adyacencia es simétrica y se retorna la misma
+        instantánea.
+        """
+        if not self.directed:
+            return self
+
+        n = len(self.vertices)
+        counts = array('q', [0]) * (n + 1)
+        for u in range(n):
+            for k in range(self.indptr[u], self.indend[u]):
+                counts[self.indices[k] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+
+        indptr = array('q', counts)
+        fill = array('q', counts)
+        indices = array('q', [0]) * self.arcs
+        weights = array('d', [0.0]) * self.arcs
+        for u in range(n):
+            for k in range(self.indptr[u], self.indend[u]):
+                v = self.indices[k]
+                pos = fill[v]
+                indices[pos] = u
+                weights[pos] = self.weights[k]
+                fill[v] = pos + 1
+
+        return CSRGraph(self.vertices, indptr, indices, weights, True, self.index)
+
+
+def dijkstra_csr(csr: CSRGraph, source: int, target: int = -1,
+                 queue: Optional[str] = None) -> Tuple[array, array]:
+    """
+    Dijkstra sobre una instantánea CSR usando arreglos indexados por entero
+
+    Args:
+        csr: Instantánea del grafo
+        source: Índice del nodo fuente
+        target: Índice del nodo destino (-1 para explorar todo el grafo)
+        queue: 'heap', 'bucket' o None para elegir la cola de cubetas cuando
+            todos los pesos son enteros pequeños no negativos
+
+    Returns:
+        Tupla (distances, predecessors) como arreglos de largo n
+    """
+    if queue is None:
+        queue = 'bucket' if csr.int_weight_bound != -1 else 'heap'
+    if queue == 'bucket':
+        if csr.int_weight_bound == -1:
+            raise ValueError("La cola de cubetas requiere pesos enteros pequeños no negativos")
+        return bucket_dijkstra_csr(csr, source, target)
+
+    n = len(csr)
+    indptr, indend = csr.indptr, csr.indend
+    indices, weights = csr.indices, csr.weights
+
+    dist = array('d', [inf]) * n
+    pred = array('q', [-1]) * n
+    settled = bytearray(n)
+
+    dist[source] = 0.0
+    # Los índices enteros desempatan sin necesidad de un contador
+    pq = [(0.0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        d, u = pop(pq)
+        if settled[u]:
+            continue
+        settled[u] = 1
+
+        if u == target:
+            break
+
+        for k in range(indptr[u], indend[u]):
+            v = indices[k]
+            if settled[v]:
+                continue
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                push(pq, (nd, v))
+
+    return dist, pred
+
+
+def bidirectional_dijkstra_csr(csr: CSRGraph, reverse: CSRGraph,
+                               source: int, target: int) -> Optional[Tuple[List[int], float]]:
+    """
+    Dijkstra bidireccional: una frontera desde source y otra hacia target
+
+    Se expande siempre la frontera con menor distancia tentativa y la búsqueda
+    termina cuando la suma de ambos mínimos supera la mejor distancia de
+    encuentro conocida (mu).
+
+    Args:
+        csr: Instantánea del grafo (búsqueda hacia adelante)
+        reverse: Instantánea con arcos invertidos (búsqueda hacia atrás)
+        source: Índice del nodo origen
+        target: Índice del nodo destino
+
+    Returns:
+        Tupla (path en índices, distancia) o None si no hay ruta
+    """
+    n = len(csr)
+    dist = (array('d', [inf]) * n, array('d', [inf]) * n)
+    pred = (array('q', [-1]) * n, array('q', [-1]) * n)
+    settled = (bytearray(n), bytearray(n))
+    graphs = (csr, reverse)
+    pqs = ([(0.0, source)], [(0.0, target)])
+    pop, push = heapq.heappop, heapq.heappush
+
+    dist[0][source] = 0.0
+    dist[1][target] = 0.0
+    mu = inf
+    meeting = -1
+
+    while pqs[0] and pqs[1]:
+        if pqs[0][0][0] + pqs[1][0][0] >= mu:
+            break
+
+        # 0 = frontera hacia adelante, 1 = frontera hacia atrás
+        side = 0 if pqs[0][0][0] <= pqs[1][0][0] else 1
+        d, u = pop(pqs[side])
+        if settled[side][u]:
+            continue
+        settled[side][u] = 1
+
+        g = graphs[side]
+        this_dist, other_dist = dist[side], dist[1 - side]
+        this_pred = pred[side]
+        for k in range(g.indptr[u], g.indend[u]):
+            v = g.indices[k]
+            nd = d + g.weights[k]
+            if nd < this_dist[v]:
+                this_dist[v] = nd
+                this_pred[v] = u
+                push(pqs[side], (nd, v))
+            if other_dist[v] != inf and this_dist[v] + other_dist[v] < mu:
+                mu = this_dist[v] + other_dist[v]
+                meeting = v
+
+    if meeting == -1:
+        return None
+
+    path = reconstruct_path(pred[0], meeting)
+    current = pred[1][meeting]
+    while current != -1:
+        path.append(current)
+        current = pred[1][current]
+    return path, mu
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Distancia de gran círculo en km entre dos puntos dados en radianes"""
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def coordinate_arrays(csr: CSRGraph, coordinates) -> Optional[Tuple[array, array]]:
+    """
+    Convierte {vertex: (lat, lon)} en arreglos de radianes indexados como csr
+
+    Returns:
+        Tupla (lats, lons) o None si algún vértice no tiene coordenadas
+    """
+    lats = array('d')
+    lons = array('d')
+    for v in csr.vertices:
+        if v is None:  # Posición de un vértice eliminado: sin arcos, no se visita
+            lats.append(0.0)
+            lons.append(0.0)
+            continue
+        coords = coordinates.get(v)
+        if coords is None:
+            return None
+        lats.append(radians(coords[0]))
+        lons.append(radians(coords[1]))
+    return lats, lons
+
+
+def admissible_scale(csr: CSRGraph, lats: array, lons: array) -> float:
+    """
+    Mayor factor peso/km que mantiene la heurística admisible y consistente
+
+    Es el mínimo de peso / distancia geográfica sobre todos los arcos.
+    """
+    scale = inf
+    for u in range(len(csr)):
+        for k in range(csr.indptr[u], csr.indend[u]):
+            v = csr.indices[k]
+            d = haversine_km(lats[u], lons[u], lats[v], lons[v])
+            if d > 0:
+                scale = min(scale, csr.weights[k] / d)
+    return 0.0 if scale == inf else scale
+
+
+def astar_csr(csr: CSRGraph, source: int, target: int, lats: array, lons: array,
+              scale: float) -> Tuple[array, array]:
+    """
+    A* con heurística scale * distancia geográfica al destino
+
+    Los nodos pueden reabrirse, por lo que basta con que la heurística sea
+    admisible para obtener la ruta óptima.
+
+    Returns:
+        Tupla (distances, predecessors) como arreglos de largo n
+    """
+    n = len(csr)
+    indptr, indend = csr.indptr, csr.indend
+    indices, weights = csr.indices, csr.weights
+    t_lat, t_lon = lats[target], lons[target]
+
+    dist = array('d', [inf]) * n
+    pred = array('q', [-1]) * n
+    heuristic = array('d', [-1.0]) * n  # -1 = aún no calculada
+
+    dist[source] = 0.0
+    heuristic[source] = scale * haversine_km(lats[source], lons[source], t_lat, t_lon)
+    pq = [(heuristic[source], source)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        f, u = pop(pq)
+        if f > dist[u] + heuristic[u]:
+            continue  # Entrada obsoleta
+
+        if u == target:
+            break
+
+        g = dist[u]
+        for k in range(indptr[u], indend[u]):
+            v = indices[k]
+            ng = g + weights[k]
+            if ng < dist[v]:
+                dist[v] = ng
+                pred[v] = u
+                h = heuristic[v]
+                if h < 0:
+                    h = scale * haversine_km(lats[v], lons[v], t_lat, t_lon)
+                    heuristic[v] = h
+                push(pq, (ng + h, v))
+
+    return dist, pred
+
+
+def restricted_dijkstra_csr(csr: CSRGraph, source: int, target: int, banned_nodes,
+                            banned_arcs) -> Optional[Tuple[List[int], List[float]]]:
+    """
+    Dijkstra que ignora ciertos nodos y arcos (búsqueda de desvío de Yen)
+
+    Args:
+        csr: Instantánea del grafo
+        source: Índice del nodo origen
+        target: Índice del nodo destino
+        banned_nodes: Conjunto de índices que no se pueden visitar
+        banned_arcs: Conjunto de pares (u, v) que no se pueden usar
+
+    Returns:
+        Tupla (path en índices, distancia acumulada en cada nodo del path) o None
+    """
+    indptr, indend = csr.indptr, csr.indend
+    indices, weights = csr.indices, csr.weights
+    dist = {source: 0.0}
+    pred = {source: -1}
+    settled = set()
+    pq = [(0.0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        d, u = pop(pq)
+        if u in settled:
+            continue
+        settled.add(u)
+
+        if u == target:
+            path = []
+            while u != -1:
+                path.append(u)
+                u = pred[u]
+            path.reverse()
+            return path, [dist[x] for x in path]
+
+        for k in range(indptr[u], indend[u]):
+            v = indices[k]
+            if v in settled or v in banned_nodes or (u, v) in banned_arcs:
+                continue
+            nd = d + weights[k]
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                pred[v] = u
+                push(pq, (nd, v))
+
+    return None
+
+
+def repair_decrease(csr: CSRGraph, dist: array, pred: array, u: int, v: int,
+                    weight: float) -> bool:
+    """
+    Repara un árbol de caminos mínimos tras insertar o abaratar el arco u -> v
+
+    Solo se propagan mejoras, así que basta un Dijkstra parcial desde v.
+
+    Returns:
+        True si el árbol cambió
+    """
+    nd = dist[u] + weight
+    if not nd < dist[v]:
+        return False
+
+    indptr, indend = csr.indptr, csr.indend
+    indices, weights = csr.indices, csr.weights
+    dist[v] = nd
+    pred[v] = u
+    pq = [(nd, v)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        d, x = pop(pq)
+        if d > dist[x]:
+            continue
+        for k in range(indptr[x], indend[x]):
+            y = indices[k]
+            ny = d + weights[k]
+            if ny < dist[y]:
+                dist[y] = ny
+                pred[y] = x
+                push(pq, (ny, y))
+
+    return True
+
+
+def reconstruct_path(pred: array, target: int) -> List[int]:
+    """Reconstruye la ruta (en índices) hasta target siguiendo los predecesores"""
+    path = []
+    current = target
+    while current != -1:
+        path.append(current)
+        current = pred[current]
+    path.reverse()
+    return path
+
+
+def bucket_dijkstra_csr(csr: CSRGraph, source: int, target: int = -1) -> Tuple[array, array]:
+    """
+    Dijkstra con cola de cubetas (Dial) para pesos enteros en [0, C]
+
+    Hay C + 1 cubetas circulares indexadas por distancia. Dentro de cada
+    cubeta los nodos salen por índice creciente, igual que el desempate del
+    montículo, por lo que el resultado es idéntico al de dijkstra_csr con
+    queue='heap'.
+
+    Returns:
+        Tupla (distances, predecessors) como arreglos de largo n
+    """
+    n = len(csr)
+    indptr, indend = csr.indptr, csr.indend
+    indices, weights = csr.indices, csr.weights
+    nbuckets = csr.int_weight_bound + 1
+
+    dist = array('d', [inf]) * n
+    pred = array('q', [-1]) * n
+    settled = bytearray(n)
+    buckets = [[] for _ in range(nbuckets)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    dist[source] = 0.0
+    buckets[0].append(source)
+    pending = 1
+    d = 0
+
+    while pending:
+        bucket = buckets[d % nbuckets]
+        while bucket:
+            u = pop(bucket)
+            pending -= 1
+            if settled[u] or dist[u] != d:
+                continue  # Entrada obsoleta
+            settled[u] = 1
+
+            if u == target:
+                return dist, pred
+
+            for k in range(indptr[u], indend[u]):
+                v = indices[k]
+                if settled[v]:
+                    continue
+                nd = d + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    push(buckets[int(nd) % nbuckets], v)
+                    pending += 1
+        d += 1
+
+    return dist, pred
+
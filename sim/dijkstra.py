@@ -1,162 +1,603 @@
 import heapq
+import weakref
+from collections import OrderedDict
 from typing import List, Dict, Tuple, Optional
+from array import array
+from model import GraphChange
+from sim.csr_graph import (CSRGraph, dijkstra_csr,
+                           bidirectional_dijkstra_csr, astar_csr, coordinate_arrays,
+                           admissible_scale, repair_decrease, restricted_dijkstra_csr,
+                           reconstruct_path)
+from sim.contraction import ContractionHierarchy
+from sim.distance_matrix import compute_distance_matrix
+
+
+def _weak_listener(method):
+    """Callback para Graph.subscribe que no mantiene vivo al dueño de method"""
+    ref = weakref.WeakMethod(method)
+
+    def listener(change):
+        target = ref()
+        if target is not None:
+            target(change)
+    return listener
+
+
+class ShortestPathTreeCache:
+    """
+    Caché LRU de árboles de caminos mínimos, uno por nodo fuente
+
+    Cada entrada guarda los arreglos (distances, predecessors) de una búsqueda
+    completa desde la fuente. Se expulsa la entrada menos usada cuando se
+    supera el número máximo de entradas o el presupuesto de memoria.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # fuente -> (distances, predecessors)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def enabled(self) -> bool:
+        """Indica si la caché puede guardar al menos una entrada"""
+        return self.max_entries > 0 and (self.max_bytes is None or self.max_bytes > 0)
+
+    def get(self, key):
+        """Retorna el árbol asociado a key (y lo marca como reciente) o None"""
+        tree = self._entries.get(key)
+        if tree is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return tree
+
+    def put(self, key, distances, predecessors):
+        """Guarda un árbol y expulsa entradas antiguas si se excede el presupuesto"""
+        if key in self._entries:
+            self._bytes -= self._tree_bytes(self._entries.pop(key))
+        tree = (distances, predecessors)
+        self._entries[key] = tree
+        self._bytes += self._tree_bytes(tree)
+
+        while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= self._tree_bytes(old)
+            self.evictions += 1
+
+    def items(self):
+        """Pares (fuente, (distances, predecessors)) almacenados"""
+        return list(self._entries.items())
+
+    def discard(self, key):
+        """Elimina la entrada de key si existe"""
+        tree = self._entries.pop(key, None)
+        if tree is not None:
+            self._bytes -= self._tree_bytes(tree)
+
+    def grow(self, count=1):
+        """Extiende todos los árboles con count nodos nuevos (inalcanzables)"""
+        for distances, predecessors in self._entries.values():
+            distances.extend(array('d', [float('inf')]) * count)
+            predecessors.extend(array('q', [-1]) * count)
+            self._bytes += count * (distances.itemsize + predecessors.itemsize)
+
+    def clear(self):
+        """Descarta todas las entradas (los contadores se mantienen)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por los arreglos almacenados"""
+        return self._bytes
+
+    def stats(self) -> Dict:
+        """Resumen de uso de la caché"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _tree_bytes(tree) -> int:
+        return sum(buf.itemsize * len(buf) for buf in tree)
+
+
+class ShortestPathTree:
+    """
+    Resultado de una búsqueda desde una fuente: distancias y predecesores
+
+    Las rutas se construyen bajo demanda con path_to. Para compatibilidad se
+    comporta como el diccionario {nodo_destino: (path, distance)} de los nodos
+    alcanzables. Guarda copias de los vértices y del índice de la instantánea:
+    el router los modifica en el lugar cuando el grafo cambia, y el árbol
+    describe el grafo del momento en que se calculó.
+    """
+
+    def __init__(self, snapshot: CSRGraph, source: int, distances, predecessors):
+        self._vertices = list(snapshot.vertices)
+        self._index = dict(snapshot.index)
+        self.source = source
+        self.distances = distances
+        self.predecessors = predecessors
+
+    def _position(self, vertex) -> int:
+        """Índice del vértice si es alcanzable, o -1"""
+        i = self._index.get(vertex, -1)
+        if i == -1 or i >= len(self.distances) or self.distances[i] == float('inf'):
+            return -1
+        return i
+
+    def distance_to(self, vertex) -> float:
+        """Distancia mínima hasta vertex (inf si no es alcanzable)"""
+        i = self._position(vertex)
+        return float('inf') if i == -1 else self.distances[i]
+
+    def path_to(self, vertex) -> Optional[List]:
+        """Ruta desde la fuente hasta vertex, o None si no es alcanzable"""
+        i = self._position(vertex)
+        if i == -1:
+            return None
+        vertices = self._vertices
+        return [vertices[j] for j in reconstruct_path(self.predecessors, i)]
+
+    def __getitem__(self, vertex) -> Tuple[List, float]:
+        i = self._position(vertex)
+        if i == -1:
+            raise KeyError(vertex)
+        return (self.path_to(vertex), self.distances[i])
+
+    def get(self, vertex, default=None):
+        return self[vertex] if vertex in self else default
+
+    def __contains__(self, vertex) -> bool:
+        return self._position(vertex) != -1
+
+    def __iter__(self):
+        """Itera los nodos alcanzables (sin construir rutas)"""
+        inf = float('inf')
+        vertices = self._vertices
+        for i, distance in enumerate(self.distances):
+            if distance != inf and vertices[i] is not None:
+                yield vertices[i]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[v] for v in self]
+
+    def items(self):
+        return [(v, self[v]) for v in self]
+
 
 class DijkstraRouter:
     """
     Implementación del algoritmo de Dijkstra para encontrar rutas más cortas
     """
-    
-    def __init__(self, graph):
+
+    # Modos de búsqueda punto a punto disponibles en find_shortest_path
+    METHODS = ('dijkstra', 'bidirectional', 'astar', 'ch')
+
+    def __init__(self, graph, cache_entries=32, cache_bytes=None, method='dijkstra',
+                 snapshot=None):
+        """
+        Args:
+            graph: Grafo sobre el que se calculan las rutas
+            cache_entries: Máximo de árboles de caminos mínimos en caché (0 la desactiva)
+            cache_bytes: Presupuesto de memoria de la caché en bytes (None sin límite)
+            method: Modo por defecto de find_shortest_path ('dijkstra', 'bidirectional',
+                'astar' o 'ch')
+            snapshot: Instantánea CSR ya construida para la versión actual del
+                grafo (None la construye recorriendo el grafo)
+        """
         self.graph = graph
-        self.adjacency_list = self._build_adjacency_list()
-    
-    def _build_adjacency_list(self) -> Dict:
-        """Construye lista de adyacencia para Dijkstra"""
-        adj_list = {}
-        
-        # Inicializar todos los nodos
-        for vertex in self.graph.vertices():
-            adj_list[vertex] = []
-        
-        # Agregar aristas con pesos
-        for edge in self.graph.edges():
-            u, v = edge.endpoints()
-            weight = edge.element()
-            
-            # Grafo no dirigido - agregar en ambas direcciones
-            adj_list[u].append((v, weight))
-            adj_list[v].append((u, weight))
-        
-        return adj_list
-    
-    def find_shortest_path(self, start, end) -> Optional[Tuple[List, float]]:
+        self.method = self._check_method(method)
+        self.tree_cache = ShortestPathTreeCache(cache_entries, cache_bytes)
+        self.coordinates = None
+        self.astar_scale = None
+        self.snapshot = self._build_snapshot(snapshot)
+        # Los cambios del grafo se aplican de forma incremental. El grafo solo
+        # guarda una referencia débil al router: un router descartado se libera
+        # y su suscripción se quita sola
+        listener = _weak_listener(self._on_graph_change)
+        graph.subscribe(listener)
+        self._unsubscribe = weakref.finalize(self, graph.unsubscribe, listener)
+
+    def close(self):
+        """
+        Deja de recibir los cambios del grafo; si se vuelve a consultar, sync()
+        reconstruye la instantánea cuando la versión del grafo cambió
+        """
+        self._unsubscribe()
+
+    def _check_method(self, method) -> str:
+        if method not in self.METHODS:
+            raise ValueError(f"Método de búsqueda desconocido: {method}")
+        return method
+
+    def _build_snapshot(self, snapshot=None) -> CSRGraph:
+        """
+        Construye la instantánea CSR (índices enteros y buffers planos) para
+        Dijkstra, o adopta snapshot si ya viene construida para la versión actual
+        """
+        self._snapshot_version = self.graph.version
+        self._reverse_snapshot = None
+        self._astar_data = None
+        self.hierarchy = None
+        self.tree_cache.clear()
+        return snapshot if snapshot is not None else CSRGraph.from_graph(self.graph)
+
+    def set_coordinates(self, coordinates, scale=None):
+        """
+        Registra coordenadas geográficas para el modo 'astar'
+
+        Args:
+            coordinates: Diccionario {nodo: (lat, lon)}, p. ej. el de
+                MapBuilder.generate_node_coordinates
+            scale: Costo mínimo por km recorrido. Debe cumplir
+                scale * distancia_km <= peso de cada arista para que la
+                heurística sea admisible. None lo calcula a partir de las aristas.
+        """
+        self.coordinates = coordinates or None
+        self.astar_scale = scale
+        self._astar_data = None
+
+    def has_coordinates(self) -> bool:
+        """Indica si el modo 'astar' puede usar una heurística geográfica"""
+        return self._astar() is not None
+
+    def _astar(self):
+        """Retorna (lats, lons, scale) para la instantánea actual o None"""
+        if self.coordinates is None:
+            return None
+        self.sync()
+        if self._astar_data is None:
+            arrays = coordinate_arrays(self.snapshot, self.coordinates)
+            if arrays is None:
+                self._astar_data = False
+            else:
+                lats, lons = arrays
+                scale = self.astar_scale
+                if scale is None:
+                    scale = admissible_scale(self.snapshot, lats, lons)
+                self._astar_data = (lats, lons, scale)
+        return self._astar_data or None
+
+    def build_contraction_hierarchy(self, witness_settle_limit=50) -> Dict:
+        """
+        Preprocesa el grafo actual como jerarquía de contracción para el modo 'ch'
+
+        La jerarquía se descarta cuando el grafo cambia; hasta volver a
+        construirla, el modo 'ch' usa Dijkstra normal.
+
+        Returns:
+            Estadísticas del preprocesamiento (tiempo, atajos y memoria)
+        """
+        self.hierarchy = ContractionHierarchy(self.sync(), witness_settle_limit)
+        return self.hierarchy.stats()
+
+    def _reverse(self) -> CSRGraph:
+        """Instantánea con arcos invertidos, construida bajo demanda"""
+        if self._reverse_snapshot is None:
+            self._reverse_snapshot = self.snapshot.reverse()
+        return self._reverse_snapshot
+
+    def sync(self) -> CSRGraph:
+        """Reconstruye la instantánea si el grafo cambió desde la última consulta"""
+        if self.graph.version != self._snapshot_version:
+            self.snapshot = self._build_snapshot()
+        return self.snapshot
+
+    def shortest_path_tree(self, source: int):
+        """
+        Retorna (distances, predecessors) desde el índice source de la instantánea
+
+        Usa la caché de árboles si está activa. Llamar después de sincronizar
+        la instantánea (los índices dependen de ella).
+        """
+        tree = self.tree_cache.get(source)
+        if tree is None:
+            tree = dijkstra_csr(self.snapshot, source)
+            if self.tree_cache.enabled():
+                self.tree_cache.put(source, *tree)
+        return tree
+
+    def shortest_path_tree_to(self, target: int):
+        """
+        Retorna (distances, predecessors) hacia el índice target: distances[i]
+        es el costo de ir desde i hasta target
+
+        En grafos no dirigidos es el árbol cacheado con fuente target; en
+        dirigidos, una búsqueda sobre la instantánea con arcos invertidos.
+        """
+        if not self.snapshot.directed:
+            return self.shortest_path_tree(target)
+        return dijkstra_csr(self._reverse(), target)
+
+    def _on_graph_change(self, change):
+        """
+        Aplica un cambio del grafo a la instantánea sin reconstruirla
+
+        Los árboles en caché se reparan cuando una arista se agrega o se
+        abarata, y se descartan solo si la arista que empeora o desaparece
+        forma parte del árbol.
+        """
+        if change.version != self._snapshot_version + 1 or change.kind == GraphChange.BULK_UPDATE:
+            return  # Se perdió un cambio o fue una carga masiva: sync() reconstruirá todo
+
+        snapshot = self.snapshot
+        # Estructuras derivadas que se recalculan bajo demanda
+        self._reverse_snapshot = None
+        self._astar_data = None
+        self.hierarchy = None
+
+        if change.kind == GraphChange.INSERT_VERTEX:
+            snapshot.add_vertex(change.u)
+            self.tree_cache.grow()
+        elif change.kind == GraphChange.REMOVE_VERTEX:
+            i = snapshot.remove_vertex(change.u)
+            self.tree_cache.discard(i)
+        else:
+            self._apply_edge_change(change)
+
+        self._snapshot_version = change.version
+        if snapshot.wasted > max(1024, snapshot.arcs):
+            self.snapshot = snapshot.compacted()
+            if snapshot.has_removed():
+                self.tree_cache.clear()  # Los vértices se renumeraron
+
+    def _apply_edge_change(self, change):
+        """Actualiza los arcos de una arista y mantiene los árboles en caché"""
+        snapshot = self.snapshot
+        u, v = snapshot.index[change.u], snapshot.index[change.v]
+        arcs = [(u, v)]
+        if not snapshot.directed and u != v:
+            arcs.append((v, u))
+
+        if change.kind == GraphChange.REMOVE_EDGE:
+            for a, b in arcs:
+                snapshot.remove_arc(a, b)
+        else:
+            for a, b in arcs:
+                snapshot.set_arc(a, b, change.weight)
+
+        if change.kind == GraphChange.REWEIGHT_EDGE and change.weight == change.old_weight:
+            return
+
+        cheaper = change.kind == GraphChange.INSERT_EDGE or (
+            change.kind == GraphChange.REWEIGHT_EDGE and change.weight < change.old_weight)
+        for source, (distances, predecessors) in self.tree_cache.items():
+            if cheaper:
+                for a, b in arcs:
+                    repair_decrease(snapshot, distances, predecessors, a, b, change.weight)
+            elif any(predecessors[b] == a for a, b in arcs):
+                self.tree_cache.discard(source)
+
+    def find_shortest_path(self, start, end, method=None) -> Optional[Tuple[List, float]]:
         """
         Encuentra la ruta más corta entre dos nodos usando Dijkstra
-        
+
+        Args:
+            start: Nodo origen
+            end: Nodo destino
+            method: 'dijkstra', 'bidirectional', 'astar' o 'ch' (None usa el modo del router)
+
         Returns:
             Tupla (path, distance) o None si no hay ruta
         """
-        if start not in self.adjacency_list or end not in self.adjacency_list:
+        method = self.method if method is None else self._check_method(method)
+        index = self.sync().index
+        if start not in index or end not in index:
             return None
-        
+
         if start == end:
             return ([start], 0.0)
-        
-        # Inicializar distancias y predecesores
-        distances = {node: float('inf') for node in self.adjacency_list}
-        predecessors = {node: None for node in self.adjacency_list}
-        visited = set()
-        
-        distances[start] = 0
-        
-        # Cola de prioridad: (distancia, contador_único, nodo)
-        # El contador_único evita comparaciones entre nodos
-        pq = [(0, 0, start)]
-        counter = 1
-        
-        while pq:
-            current_dist, _, current_node = heapq.heappop(pq)
-            
-            if current_node in visited:
-                continue
-            
-            visited.add(current_node)
-            
-            # Si llegamos al destino, reconstruir ruta
-            if current_node == end:
-                path = self._reconstruct_path(predecessors, start, end)
-                return (path, distances[end])
-            
-            # Explorar vecinos
-            for neighbor, weight in self.adjacency_list[current_node]:
-                if neighbor not in visited:
-                    new_dist = current_dist + weight
-                    
-                    if new_dist < distances[neighbor]:
-                        distances[neighbor] = new_dist
-                        predecessors[neighbor] = current_node
-                        heapq.heappush(pq, (new_dist, counter, neighbor))
-                        counter += 1
-        
-        return None
-    
-    def _reconstruct_path(self, predecessors: Dict, start, end) -> List:
-        """Reconstruye la ruta desde los predecesores"""
-        path = []
-        current = end
-        
-        while current is not None:
-            path.append(current)
-            current = predecessors[current]
-        
-        path.reverse()
-        return path
-    
-    def find_shortest_paths_from_source(self, start) -> Dict:
+
+        source, target = index[start], index[end]
+        if method == 'bidirectional':
+            result = bidirectional_dijkstra_csr(self.snapshot, self._reverse(), source, target)
+            if result is None:
+                return None
+            path, distance = result
+            vertices = self.snapshot.vertices
+            return ([vertices[i] for i in path], distance)
+
+        if method == 'astar':
+            astar = self._astar()
+            if astar is not None:
+                distances, predecessors = astar_csr(self.snapshot, source, target, *astar)
+                if predecessors[target] == -1:
+                    return None
+                return (self._reconstruct_path(predecessors, target), distances[target])
+            # Sin coordenadas se usa Dijkstra normal
+
+        if method == 'ch' and self.hierarchy is not None:
+            result = self.hierarchy.query(source, target)
+            if result is None:
+                return None
+            path, distance = result
+            vertices = self.snapshot.vertices
+            return ([vertices[i] for i in path], distance)
+
+        if self.tree_cache.enabled():
+            # El árbol completo desde la fuente responde también consultas futuras
+            distances, predecessors = self.shortest_path_tree(source)
+        else:
+            distances, predecessors = dijkstra_csr(self.snapshot, source, target)
+
+        if predecessors[target] == -1:
+            return None
+
+        return (self._reconstruct_path(predecessors, target), distances[target])
+
+    def _reconstruct_path(self, predecessors, end: int) -> List:
+        """Reconstruye la ruta (en vértices) desde el arreglo de predecesores"""
+        vertices = self.snapshot.vertices
+        return [vertices[i] for i in reconstruct_path(predecessors, end)]
+
+    def iter_shortest_paths(self, start, end):
+        """
+        Genera rutas simples de start a end en orden de costo creciente (Yen)
+
+        Las búsquedas de desvío se memorizan por (ruta raíz, arcos prohibidos)
+        y los costos acumulados de cada ruta aceptada se calculan una vez, así
+        que consumir más rutas reutiliza el trabajo de las anteriores.
+
+        Yields:
+            Tuplas (path, distance)
+        """
+        index = self.sync().index
+        if start not in index or end not in index:
+            return
+        if start == end:
+            yield ([start], 0.0)
+            return
+
+        snapshot = self.snapshot
+        vertices = snapshot.vertices
+        source, target = index[start], index[end]
+
+        distances, predecessors = self.shortest_path_tree(source)
+        if distances[target] == float('inf'):
+            return
+        first = reconstruct_path(predecessors, target)
+        # Rutas aceptadas como (nodos, costo acumulado en cada nodo)
+        accepted = [(first, [distances[i] for i in first])]
+        seen = {tuple(first)}
+        candidates = []
+        counter = 0
+        spur_cache = {}
+
+        yield ([vertices[i] for i in first], distances[target])
+
+        while True:
+            last, last_costs = accepted[-1]
+            for i in range(len(last) - 1):
+                root = tuple(last[:i + 1])
+                banned_arcs = frozenset(
+                    (path[i], path[i + 1]) for path, _ in accepted
+                    if len(path) > i + 1 and tuple(path[:i + 1]) == root)
+
+                key = (root, banned_arcs)
+                if key not in spur_cache:
+                    spur_cache[key] = restricted_dijkstra_csr(
+                        snapshot, last[i], target, set(root[:-1]), banned_arcs)
+                spur = spur_cache[key]
+                if spur is None:
+                    continue
+
+                spur_path, spur_costs = spur
+                path = list(root[:-1]) + spur_path
+                if tuple(path) in seen:
+                    continue
+                seen.add(tuple(path))
+                base = last_costs[i]
+                costs = last_costs[:i] + [base + c for c in spur_costs]
+                heapq.heappush(candidates, (costs[-1], counter, path, costs))
+                counter += 1
+
+            if not candidates:
+                return
+            cost, _, path, costs = heapq.heappop(candidates)
+            accepted.append((path, costs))
+            yield ([vertices[i] for i in path], cost)
+
+    def k_shortest_paths(self, start, end, k) -> List[Tuple[List, float]]:
+        """
+        Encuentra las k rutas simples más cortas entre dos nodos
+
+        Returns:
+            Lista de tuplas (path, distance) ordenada por distancia
+        """
+        paths = []
+        if k <= 0:
+            return paths
+        # Cortar apenas se completan k rutas: reanudar el generador lanzaría
+        # otra ronda de búsquedas de desvío
+        for result in self.iter_shortest_paths(start, end):
+            paths.append(result)
+            if len(paths) == k:
+                break
+        return paths
+
+    def find_shortest_paths_from_source(self, start):
         """
         Encuentra las rutas más cortas desde un nodo fuente a todos los demás
-        
+
         Args:
             start: Nodo fuente
-            
+
         Returns:
-            Diccionario {nodo_destino: (path, distance)}
+            ShortestPathTree (accesible como {nodo_destino: (path, distance)});
+            las rutas se construyen solo al consultarlas. {} si start no existe.
         """
-        if start not in self.adjacency_list:
+        index = self.sync().index
+        if start not in index:
             return {}
-        
-        # Inicializar distancias y predecesores
-        distances = {node: float('inf') for node in self.adjacency_list}
-        predecessors = {node: None for node in self.adjacency_list}
-        visited = set()
-        
-        distances[start] = 0
-        
-        # Cola de prioridad con contador único
-        pq = [(0, 0, start)]
-        counter = 1
-        
-        while pq:
-            current_dist, _, current_node = heapq.heappop(pq)
-            
-            if current_node in visited:
-                continue
-            
-            visited.add(current_node)
-            
-            # Explorar vecinos
-            for neighbor, weight in self.adjacency_list[current_node]:
-                if neighbor not in visited:
-                    new_dist = current_dist + weight
-                    
-                    if new_dist < distances[neighbor]:
-                        distances[neighbor] = new_dist
-                        predecessors[neighbor] = current_node
-                        heapq.heappush(pq, (new_dist, counter, neighbor))
-                        counter += 1
-        
-        # Construir rutas para todos los nodos alcanzables
-        results = {}
-        for end_node in self.adjacency_list:
-            if distances[end_node] != float('inf'):
-                path = self._reconstruct_path(predecessors, start, end_node)
-                results[end_node] = (path, distances[end_node])
-        
-        return results
-    
-    def get_distance_matrix(self) -> Dict[Tuple, float]:
+
+        source = index[start]
+        distances, predecessors = self.shortest_path_tree(source)
+
+        # Copias: los árboles en caché se reparan en el lugar al cambiar el grafo
+        return ShortestPathTree(self.snapshot, source,
+                                array('d', distances), array('q', predecessors))
+
+    def distance_matrix(self, dtype=None, workers=1, out_path=None):
+        """
+        Calcula la matriz densa de distancias entre todos los pares de nodos
+
+        Args:
+            dtype: np.float32 o np.float64 (por defecto float64)
+            workers: Procesos a usar (1 = en serie, None = todos los núcleos); el
+                pool de procesos tarda en arrancar, conviene solo en grafos grandes
+            out_path: Archivo .npy opcional para escribir la matriz como memmap
+
+        Returns:
+            Tupla (matriz, índice) donde índice es {vértice: fila/columna}
+        """
+        snapshot = self.sync()
+        if snapshot.has_removed():
+            # Sin filas ni columnas para las posiciones de vértices eliminados
+            snapshot = snapshot.compacted()
+        kwargs = {} if dtype is None else {"dtype": dtype}
+        matrix = compute_distance_matrix(snapshot, workers=workers, out_path=out_path, **kwargs)
+        return matrix, dict(snapshot.index)
+
+    def get_distance_matrix(self, workers=1) -> Dict[Tuple, float]:
         """
         Calcula matriz de distancias entre todos los pares de nodos
-        
+
+        Args:
+            workers: Procesos a usar, como en distance_matrix
+
         Returns:
             Diccionario {(origen, destino): distancia}
         """
+        matrix, index = self.distance_matrix(workers=workers)
+        vertices = [None] * len(index)
+        for vertex, i in index.items():
+            vertices[i] = vertex
         distance_matrix = {}
-        
-        for start_node in self.adjacency_list:
-            paths = self.find_shortest_paths_from_source(start_node)
-            
-            for end_node, (path, distance) in paths.items():
-                distance_matrix[(start_node, end_node)] = distance
-        
-        return distance_matrix
\ No newline at end of file
+
+        for i, start_node in enumerate(vertices):
+            for j, end_node in enumerate(vertices):
+                distance = matrix[i, j]
+                if distance != float('inf'):
+                    distance_matrix[(start_node, end_node)] = float(distance)
+
+        return distance_matrix
@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from sim.csr_graph import CSRGraph, dijkstra_csr
+
+# Estado de cada proceso trabajador (se inicializa una vez por proceso)
+_worker_csr = None
+_worker_out = None
+
+
+def _init_worker(indptr, indend, rowcap, indices, weights, directed, out_path):
+    """Reconstruye la instantánea CSR y abre la salida en el proceso trabajador"""
+    global _worker_csr, _worker_out
+    n = len(indend)
+    _worker_csr = CSRGraph([None] * n, indptr, indices, weights, directed, {},
+                           indend, rowcap)
+    _worker_out = np.load(out_path, mmap_mode='r+') if out_path else None
+
+
+def _solve_rows(csr, sources, dtype):
+    """Distancias desde cada fuente de sources como bloque (len(sources), n)"""
+    block = np.empty((len(sources), len(csr)), dtype=dtype)
+    for row, source in enumerate(sources):
+        distances, _ = dijkstra_csr(csr, source)
+        block[row] = np.frombuffer(distances, dtype=np.float64)
+    return block
+
+
+def _worker_rows(start, stop, dtype):
+    block = _solve_rows(_worker_csr, range(start, stop), dtype)
+    if _worker_out is None:
+        return start, block
+    _worker_out[start:stop] = block
+    _worker_out.flush()
+    return start, None
+
+
+def compute_distance_matrix(csr: CSRGraph, dtype=np.float64, workers: Optional[int] = 1,
+                            out_path: Optional[str] = None, chunk_size: int = 64) -> np.ndarray:
+    """
+    Matriz densa de distancias mínimas entre todos los pares de nodos
+
+    Las fuentes se reparten en bloques de filas entre procesos; cada proceso
+    ejecuta una búsqueda por fuente sobre su propia copia de la instantánea.
+
+    Args:
+        csr: Instantánea del grafo
+        dtype: np.float32 o np.float64 (los nodos inalcanzables quedan en inf)
+        workers: Número de procesos (1 = sin procesos, None = núcleos disponibles)
+        out_path: Archivo .npy de salida; si se indica, la matriz se escribe en
+            disco y se retorna como memmap en lugar de mantenerse en RAM
+        chunk_size: Fuentes por tarea enviada a cada proceso
+
+    Returns:
+        Arreglo (n, n) donde [i, j] es la distancia del nodo i al nodo j
+    """
+    n = len(csr)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if out_path:
+        matrix = np.lib.format.open_memmap(out_path, mode='w+', dtype=dtype, shape=(n, n))
+    else:
+        matrix = np.empty((n, n), dtype=dtype)
+
+    chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        for start, stop in chunks:
+            matrix[start:stop] = _solve_rows(csr, range(start, stop), dtype)
+    else:
+        if out_path:
+            matrix.flush()
+        init_args = (csr.indptr, csr.indend, csr.rowcap, csr.indices, csr.weights,
+                     csr.directed, out_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            futures = [pool.submit(_worker_rows, start, stop, dtype) for start, stop in chunks]
+            for future in futures:
+                start, block = future.result()
+                if block is not None:
+                    matrix[start:start + len(block)] = block
+
+    if out_path:
+        matrix.flush()
+    return matrix
@@ -0,0 +1,302 @@
+import heapq
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class EventKind:
+    """Tipos de evento del motor"""
+    ORDER_ARRIVAL = 'order_arrival'
+    TAKEOFF = 'takeoff'
+    ARRIVE_NODE = 'arrive_node'
+    RECHARGE_START = 'recharge_start'
+    RECHARGE_END = 'recharge_end'
+    DELIVERY = 'delivery'
+    DRONE_RETURN = 'drone_return'
+
+
+class Trip:
+    """Estado de una orden en vuelo"""
+    __slots__ = ('order', 'route', 'position', 'charge', 'recharge_at',
+                 'arrival_time', 'takeoff_time', 'drone', 'deadhead')
+
+    def __init__(self, order, route, arrival_time, drone=None, deadhead=0.0):
+        self.order = order
+        self.route = route
+        self.position = 0            # Índice del nodo actual en route.path
+        self.charge = 0.0            # Batería restante
+        self.recharge_at = ()        # Índices del path donde se recarga
+        self.arrival_time = arrival_time
+        self.takeoff_time = None
+        self.drone = drone           # Dron asignado (None sin modelo de flota)
+        self.deadhead = deadhead     # Batería gastada en llegar al origen
+
+
+class EventEngine:
+    """
+    Simulación de eventos discretos sobre una Simulation
+
+    Los eventos se guardan en un montículo de tuplas (tiempo, secuencia, tipo,
+    dato); avanzar el reloj cuesta O(log n) por evento. La secuencia rompe
+    empates en orden de programación, así que una ejecución es determinista.
+    Las unidades de tiempo son las del peso de las aristas dividido por speed.
+    """
+
+    def __init__(self, sim, speed=1.0, recharge_time=5.0, tree_cache_bytes=64 << 20):
+        """
+        Args:
+            sim: Simulation con el grafo, el router y las órdenes
+            speed: Unidades de costo de arista recorridas por unidad de tiempo
+            recharge_time: Duración de una recarga completa
+            tree_cache_bytes: Memoria que puede usar la caché de árboles del
+                router para guardar un árbol por almacén mientras corre el
+                motor (las órdenes salen de almacenes en orden aleatorio y una
+                caché chica se vacía sin parar); al terminar cada run se
+                restaura el límite del router
+        """
+        self.sim = sim
+        self.tree_cache_bytes = tree_cache_bytes
+        self.speed = speed
+        self.recharge_time = recharge_time
+        self.now = 0.0
+        self._queue = []
+        self._seq = 0
+        self._handlers: Dict[str, Callable] = {
+            EventKind.ORDER_ARRIVAL: self._on_order_arrival,
+            EventKind.TAKEOFF: self._on_takeoff,
+            EventKind.ARRIVE_NODE: self._on_arrive_node,
+            EventKind.RECHARGE_START: self._on_recharge_start,
+            EventKind.RECHARGE_END: self._on_recharge_end,
+            EventKind.DELIVERY: self.complete_trip,
+        }
+        self._dispatcher: Optional[Callable] = None
+        self._listeners: List[Callable] = []
+        self.events_processed = 0
+        self.event_counts: Dict[str, int] = {}
+        self.delivered = 0
+        self.failed = 0
+        self.latencies: List[float] = []
+        self.wall_seconds = 0.0
+
+    def _size_tree_cache(self) -> int:
+        """
+        Agranda la caché de árboles del router hasta un árbol por almacén
+
+        Returns:
+            Límite de entradas anterior, para restaurarlo
+        """
+        cache = self.sim.dijkstra_router.tree_cache
+        previous = cache.max_entries
+        if previous <= 0:
+            return previous
+        # Cada árbol guarda distancias (8 bytes) y predecesores (8 bytes) por nodo
+        tree_bytes = 16 * max(1, self.sim.graph.num_vertices())
+        warehouses = len(self.sim.graph.vertices_by_type('warehouse'))
+        cache.max_entries = max(previous, min(warehouses, self.tree_cache_bytes // tree_bytes))
+        return previous
+
+    # ---------- Programación ----------
+
+    def schedule(self, at, kind, data=None):
+        """Programa un evento en el instante at (no puede ser anterior a now)"""
+        if at < self.now:
+            raise ValueError(f"No se puede programar en el pasado ({at} < {self.now})")
+        heapq.heappush(self._queue, (at, self._seq, kind, data))
+        self._seq += 1
+
+    def on(self, kind, handler):
+        """Reemplaza el manejador de un tipo de evento: handler(engine, data)"""
+        self._handlers[kind] = lambda data: handler(self, data)
+
+    def on_dispatch(self, handler):
+        """Reemplaza la asignación de órdenes con ruta: handler(engine, order, route)"""
+        self._dispatcher = lambda order, route: handler(self, order, route)
+
+    def subscribe(self, callback):
+        """Registra callback(tiempo, tipo, dato), llamado tras cada evento"""
+        self._listeners.append(callback)
+
+    def submit_order(self, order, at=None):
+        """Programa la llegada de una orden ya creada"""
+        self.schedule(self.now if at is None else at, EventKind.ORDER_ARRIVAL, order)
+
+    def schedule_arrivals(self, n_orders, rate=1.0, seed=None, start=None):
+        """
+        Programa n_orders llegadas de un proceso de Poisson con tasa rate
+
+        Las órdenes se crean con Simulation.generate_order al ocurrir la llegada.
+        """
+        rng = random.Random(seed)
+        at = self.now if start is None else start
+        for _ in range(n_orders):
+            at += rng.expovariate(rate)
+            self.schedule(at, EventKind.ORDER_ARRIVAL, None)
+
+    def pending(self) -> int:
+        """Eventos aún en la cola"""
+        return len(self._queue)
+
+    # ---------- Ejecución ----------
+
+    def step(self) -> bool:
+        """Procesa el siguiente evento; retorna False si la cola está vacía"""
+        return self.run(max_events=1) == 1
+
+    def run(self, until=None, max_events=None) -> int:
+        """
+        Procesa eventos hasta vaciar la cola, superar until o procesar max_events
+
+        Returns:
+            Número de eventos procesados en esta llamada
+        """
+        started = time.perf_counter()
+        cache_entries = self._size_tree_cache()
+        queue, handlers, counts = self._queue, self._handlers, self.event_counts
+        listeners = self._listeners
+        pop = heapq.heappop
+        processed = 0
+        try:
+            while queue and (max_events is None or processed < max_events):
+                if until is not None and queue[0][0] > until:
+                    self.now = until
+                    break
+                at, _, kind, data = pop(queue)
+                self.now = at
+                handlers[kind](data)
+                counts[kind] = counts.get(kind, 0) + 1
+                for callback in listeners:
+                    callback(at, kind, data)
+                processed += 1
+        finally:
+            # Las entradas de más se expulsan en la próxima inserción fuera del motor
+            self.sim.dijkstra_router.tree_cache.max_entries = cache_entries
+            self.events_processed += processed
+            self.wall_seconds += time.perf_counter() - started
+        return processed
+
+    # ---------- Manejadores ----------
+
+    def _on_order_arrival(self, order):
+        if order is None:
+            order = self.sim.generate_order()
+        route = self.sim.find_route_with_recharge(order.origin, order.destination)
+        if route is None:
+            self.fail_order(order)
+            return
+        order.route = route
+        self.dispatch(order, route)
+
+    # ---------- Ciclo de vida de las órdenes ----------
+
+    def dispatch(self, order, route):
+        """
+        Asigna una orden que ya tiene ruta; sin un manejador de on_dispatch
+        (p. ej. una Fleet) despega de inmediato desde su origen
+        """
+        if self._dispatcher is not None:
+            self._dispatcher(order, route)
+            return
+        self.schedule(self.now, EventKind.TAKEOFF, Trip(order, route, self.now))
+
+    def fail_order(self, order):
+        """Marca la orden como fallida (no hay ruta o dron que pueda volarla)"""
+        self.sim.orders.set_status(order, "failed")
+        self.failed += 1
+
+    def complete_trip(self, trip):
+        """Completa la orden entregada y registra su latencia"""
+        self.sim.orders.complete(trip.order, trip.route.cost)
+        self.delivered += 1
+        self.latencies.append(self.now - trip.arrival_time)
+
+    # ---------- Manejadores del vuelo ----------
+
+    def _on_takeoff(self, trip):
+        self.sim.orders.set_status(trip.order, "in_transit")
+        trip.takeoff_time = self.now
+        trip.charge = self._capacity(trip) - trip.deadhead
+        trip.recharge_at = self._recharge_plan(trip.route.path, self._capacity(trip), trip.charge)
+        self._fly_next(trip)
+
+    def _on_arrive_node(self, trip):
+        trip.position += 1
+        if trip.position == len(trip.route.path) - 1:
+            self.schedule(self.now, EventKind.DELIVERY, trip)
+        elif trip.position in trip.recharge_at:
+            self.schedule(self.now, EventKind.RECHARGE_START, trip)
+        else:
+            self._fly_next(trip)
+
+    def _on_recharge_start(self, trip):
+        self.schedule(self.now + self.recharge_time, EventKind.RECHARGE_END, trip)
+
+    def _on_recharge_end(self, trip):
+        trip.charge = self._capacity(trip)
+        self._fly_next(trip)
+
+    def _fly_next(self, trip):
+        """Programa la llegada al siguiente nodo del path"""
+        path = trip.route.path
+        if len(path) == 1:
+            self.schedule(self.now, EventKind.DELIVERY, trip)
+            return
+        weight = self.sim.graph.get_edge(path[trip.position], path[trip.position + 1]).element()
+        trip.charge -= weight
+        self.schedule(self.now + weight / self.speed, EventKind.ARRIVE_NODE, trip)
+
+    def _capacity(self, trip):
+        """Batería completa del dron del viaje (o la global de la simulación)"""
+        return trip.drone.battery_limit if trip.drone is not None else self.sim.battery_limit
+
+    def _recharge_plan(self, path, capacity, charge=None):
+        """
+        Índices del path donde recargar: en cada estación, solo si la batería
+        restante no alcanza para llegar a la siguiente estación o al destino
+
+        charge es la carga al despegar (None = capacity).
+        """
+        graph = self.sim.graph
+        stations = self.sim.recharge_stations
+        legs = [graph.get_edge(u, v).element() for u, v in zip(path, path[1:])]
+        plan = set()
+        charge = capacity if charge is None else charge
+        for i in range(1, len(path) - 1):
+            charge -= legs[i - 1]
+            if path[i] not in stations:
+                continue
+            ahead = 0
+            for j in range(i, len(path) - 1):
+                ahead += legs[j]
+                if path[j + 1] in stations:
+                    break
+            if ahead > charge:
+                plan.add(i)
+                charge = capacity
+        return plan
+
+    # ---------- Métricas ----------
+
+    def stats(self) -> Dict:
+        """Throughput y latencia de la red de reparto"""
+        latencies = sorted(self.latencies)
+
+        def percentile(p) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "clock": self.now,
+            "events_processed": self.events_processed,
+            "event_counts": dict(self.event_counts),
+            "pending_events": len(self._queue),
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "throughput": self.delivered / self.now if self.now > 0 else 0.0,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else None,
+            "events_per_second": (self.events_processed / self.wall_seconds
+                                  if self.wall_seconds > 0 else 0.0),
+        }
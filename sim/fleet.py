@@ -0,0 +1,264 @@
+import heapq
+from math import inf
+from typing import Dict, List
+
+from sim.events import EventKind, Trip
+from tda.indexed_set import IndexedSet
+
+
+class Drone:
+    """Dron con almacén base, batería y momento en que queda libre"""
+    __slots__ = ('drone_id', 'home', 'battery_limit', 'charge', 'available_at',
+                 'busy', 'busy_since', 'busy_time', 'trips')
+
+    def __init__(self, drone_id, home, battery_limit):
+        self.drone_id = drone_id
+        self.home = home                    # Almacén al que vuelve tras cada entrega
+        self.battery_limit = battery_limit  # Capacidad de la batería
+        self.charge = battery_limit         # Carga actual
+        self.available_at = 0.0             # Instante estimado en que queda libre (para asignar)
+        self.busy = False                   # En vuelo o recargando tras un viaje
+        self.busy_since = None              # Salida de la base del viaje actual
+        self.busy_time = 0.0                # Tiempo total ocupado
+        self.trips = 0
+
+    def __repr__(self):
+        return f"<Drone {self.drone_id} home={self.home} free_at={self.available_at:.2f}>"
+
+
+class Fleet:
+    """
+    Flota de drones y planificador de despacho sobre un EventEngine
+
+    Cada almacén tiene un índice de drones libres (IndexedSet) y una cola de
+    órdenes pendientes ordenada por (priority, llegada). Una orden va a un
+    dron libre de su almacén de origen; si no hay, al dron que despegaría
+    antes contando el traslado desde su base hasta el origen (el traslado
+    gasta batería antes del despegue) y, para los drones ocupados, su
+    available_at. Si ese dron está ocupado la orden espera en la cola de su
+    base: available_at es una estimación, así que solo despegan drones que
+    están en el índice de libres. Al volver, un dron toma la orden más urgente
+    que puede volar de su base o, si no hay, de la cola de otra base. Las
+    órdenes que ningún dron puede volar fallan al llegar.
+
+    Tras entregar, el dron vuelve a su base y recarga (recharge_time) antes de
+    quedar libre otra vez.
+    """
+
+    def __init__(self, sim, drones_per_warehouse=1, battery_limit=None):
+        """
+        Args:
+            sim: Simulation con el grafo y el router
+            drones_per_warehouse: Drones creados en cada almacén
+            battery_limit: Batería de cada dron (None usa sim.battery_limit)
+        """
+        self.sim = sim
+        self.engine = None
+        self.drones: List[Drone] = []
+        self._idle: Dict[object, IndexedSet] = {}   # almacén -> drones libres
+        self._homed: Dict[object, int] = {}         # almacén -> drones con esa base
+        self._pending: Dict[object, list] = {}      # almacén -> cola de órdenes
+        self._seq = 0
+        self.queue_delays: List[float] = []
+        self.max_pending = 0
+        self._pending_count = 0
+
+        capacity = sim.battery_limit if battery_limit is None else battery_limit
+        for warehouse in list(sim.graph.vertices_by_type('warehouse')):
+            for _ in range(drones_per_warehouse):
+                self.add_drone(warehouse, capacity)
+
+    def add_drone(self, home, battery_limit=None) -> Drone:
+        """Agrega un dron libre con base en el almacén home"""
+        capacity = self.sim.battery_limit if battery_limit is None else battery_limit
+        drone = Drone(f"DRN_{len(self.drones) + 1}", home, capacity)
+        self.drones.append(drone)
+        self._homed[home] = self._homed.get(home, 0) + 1
+        self._idle.setdefault(home, IndexedSet()).add(drone)
+        return drone
+
+    def idle_at(self, warehouse) -> IndexedSet:
+        """Drones libres en un almacén"""
+        return self._idle.get(warehouse) or IndexedSet()
+
+    def pending_orders(self) -> int:
+        """Órdenes esperando un dron"""
+        return self._pending_count
+
+    # ---------- Integración con el motor de eventos ----------
+
+    def attach(self, engine):
+        """Conecta la flota al despacho, las entregas y los regresos del motor"""
+        self.engine = engine
+        engine.on_dispatch(lambda _, order, route: self.submit(order, route, engine.now))
+        engine.on(EventKind.DELIVERY, lambda _, trip: self._on_delivery(trip))
+        engine.on(EventKind.DRONE_RETURN, lambda _, drone: self._on_drone_return(drone))
+        return self
+
+    def _can_fly(self, drone, route, deadhead=0.0) -> bool:
+        """Si el dron puede volar la ruta tras gastar deadhead en llegar al origen"""
+        if deadhead > drone.battery_limit:
+            return False
+        return self.sim.is_path_feasible(route.path, self.sim.recharge_stations,
+                                         drone.battery_limit, drone.battery_limit - deadhead)
+
+    def submit(self, order, route, now):
+        """
+        Asigna la orden al dron que puede estar antes en su origen
+
+        Para cada dron que puede volar la ruta (contando el traslado desde su
+        base) se estima el instante de despegue: now si está libre, o su
+        available_at si está ocupado, más el traslado. Si el mejor está libre
+        despega; si no, la orden espera en la cola de la base de ese dron. Si
+        ningún dron puede volarla, la orden falla.
+        """
+        for drone in self.idle_at(order.origin):
+            if self._can_fly(drone, route):
+                self._dispatch(drone, order, route, now, now)
+                return
+
+        deadheads = self._deadheads_to(order.origin)
+        speed = self.engine.speed
+        feasible = {}   # (batería, traslado) -> si la ruta es volable
+        best, best_takeoff, best_deadhead = None, inf, 0.0
+        for drone in self.drones:
+            deadhead = deadheads.get(drone.home, inf)
+            if deadhead == inf:
+                continue
+            takeoff = (max(now, drone.available_at) if drone.busy else now) + deadhead / speed
+            if takeoff >= best_takeoff:
+                continue
+            key = (drone.battery_limit, deadhead)
+            if key not in feasible:
+                feasible[key] = self._can_fly(drone, route, deadhead)
+            if feasible[key]:
+                best, best_takeoff, best_deadhead = drone, takeoff, deadhead
+
+        if best is None:
+            self.engine.fail_order(order)  # Ningún dron de la flota puede volar la ruta
+        elif not best.busy:
+            self._dispatch(best, order, route, now, now, best_deadhead)
+        else:
+            queue = self._pending.setdefault(best.home, [])
+            heapq.heappush(queue, (order.priority, self._seq, order, route, now))
+            self._seq += 1
+            self._pending_count += 1
+            self.max_pending = max(self.max_pending, self._pending_count)
+
+    def _deadheads_to(self, origin) -> Dict:
+        """Costo del traslado desde cada base de la flota hasta origin"""
+        router = self.sim.dijkstra_router
+        snapshot = router.sync()
+        if origin not in snapshot.index:
+            return {}
+        distances, _ = router.shortest_path_tree_to(snapshot.index[origin])
+        index = snapshot.index
+        return {home: distances[index[home]] for home in self._homed if home in index}
+
+    def _dispatch(self, drone, order, route, queued_at, now, deadhead=0.0):
+        """Saca al dron del índice de libres y programa el despegue"""
+        engine = self.engine
+        if drone.busy:
+            raise RuntimeError(f"{drone.drone_id} ya tiene un viaje asignado")
+        self._idle[drone.home].remove(drone)
+        drone.busy = True
+        takeoff = now + deadhead / engine.speed
+        # Estimación sin recargas en ruta; se corrige al entregar
+        back = self._return_cost(route.path[-1], drone.home)
+        drone.available_at = takeoff + (route.cost + back) / engine.speed + engine.recharge_time
+        drone.busy_since = now
+        drone.trips += 1
+        self.queue_delays.append(takeoff - queued_at)
+        engine.schedule(takeoff, EventKind.TAKEOFF, Trip(order, route, queued_at, drone, deadhead))
+
+    def _on_delivery(self, trip):
+        engine = self.engine
+        engine.complete_trip(trip)
+        drone = trip.drone
+        drone.charge = trip.charge
+        back = self._return_cost(trip.route.path[-1], drone.home)
+        drone.available_at = engine.now + back / engine.speed + engine.recharge_time
+        engine.schedule(drone.available_at, EventKind.DRONE_RETURN, drone)
+
+    def _return_cost(self, node, home) -> float:
+        """Costo de volver desde node hasta la base"""
+        router = self.sim.dijkstra_router
+        snapshot = router.sync()
+        if snapshot.directed:
+            result = router.find_shortest_path(node, home)
+            return result[1] if result else 0.0
+        distances, _ = router.shortest_path_tree(snapshot.index[home])
+        cost = distances[snapshot.index[node]]
+        return 0.0 if cost == inf else cost
+
+    def _on_drone_return(self, drone):
+        """
+        El dron vuelve a su base recargado y toma la orden más urgente que
+        puede volar de la cola de su base; si no hay, la de otra base
+        """
+        now = self.engine.now
+        drone.busy_time += now - drone.busy_since
+        drone.busy_since = None
+        drone.busy = False
+        drone.charge = drone.battery_limit
+        self._idle[drone.home].add(drone)
+
+        queues = sorted(((queue[0][:2], home, queue) for home, queue in self._pending.items()
+                         if queue and home != drone.home), key=lambda item: item[0])
+        own = self._pending.get(drone.home)
+        if own:
+            queues.insert(0, (None, drone.home, own))
+        for _, _, queue in queues:
+            entry, deadhead = self._take_order(queue, drone)
+            if entry is not None:
+                _, _, order, route, queued_at = entry
+                self._pending_count -= 1
+                self._dispatch(drone, order, route, queued_at, now, deadhead)
+                return
+
+    def _take_order(self, queue, drone):
+        """
+        Saca de la cola la orden más urgente que el dron puede volar desde su
+        base; las que no puede volar siguen en la cola para otros drones
+
+        Returns:
+            Tupla (entrada de la cola o None, costo del traslado hasta su origen)
+        """
+        skipped = []
+        taken, taken_deadhead = None, 0.0
+        deadheads = {}  # origen -> traslado desde la base del dron
+        while queue:
+            entry = heapq.heappop(queue)
+            origin = entry[2].origin
+            if origin not in deadheads:
+                deadheads[origin] = (0.0 if origin == drone.home
+                                     else self._deadheads_to(origin).get(drone.home, inf))
+            if deadheads[origin] != inf and self._can_fly(drone, entry[3], deadheads[origin]):
+                taken, taken_deadhead = entry, deadheads[origin]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(queue, entry)
+        return taken, taken_deadhead
+
+    # ---------- Métricas ----------
+
+    def stats(self) -> Dict:
+        """Utilización de la flota y demora en cola de las órdenes"""
+        clock = self.engine.now if self.engine is not None else 0.0
+        busy = 0.0
+        for drone in self.drones:
+            busy += drone.busy_time
+            if drone.busy_since is not None:
+                busy += clock - drone.busy_since
+        delays = sorted(self.queue_delays)
+        return {
+            "drones": len(self.drones),
+            "idle_drones": sum(len(idle) for idle in self._idle.values()),
+            "pending_orders": self._pending_count,
+            "max_pending_orders": self.max_pending,
+            "utilization": busy / (len(self.drones) * clock) if self.drones and clock > 0 else 0.0,
+            "queue_delay_mean": sum(delays) / len(delays) if delays else None,
+            "queue_delay_p95": delays[min(len(delays) - 1, int(0.95 * len(delays)))] if delays else None,
+            "queue_delay_max": delays[-1] if delays else None,
+        }
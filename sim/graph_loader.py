@@ -0,0 +1,203 @@
+from array import array
+from itertools import islice
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from model import Graph
+from sim.csr_graph import CSRGraph
+
+
+class _NodeTable:
+    """Asigna ids enteros densos a los nombres de nodo a medida que aparecen"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.types: List[str] = []
+
+    def add(self, name, node_type='client') -> int:
+        if name in self.ids:
+            return self.ids[name]
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+        self.types.append(node_type)
+        return self.ids[name]
+
+    def encode(self, names: np.ndarray) -> np.ndarray:
+        """Ids de un arreglo de nombres; solo los nombres distintos pasan por Python"""
+        uniques, inverse = np.unique(names, return_inverse=True)
+        codes = np.fromiter((self.add(str(name)) for name in uniques),
+                            dtype=np.int64, count=len(uniques))
+        return codes[inverse.reshape(-1)]
+
+
+def _read_csv_chunks(path, chunk_size):
+    """
+    Lee un CSV con encabezado por bloques de chunk_size filas
+
+    Yields:
+        Tuplas (encabezado, arreglo de strings de forma (filas, columnas))
+    """
+    with open(path, encoding='utf-8') as f:
+        header = [name.strip() for name in f.readline().split(',')]
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+            block = np.loadtxt(lines, delimiter=',', dtype=str, ndmin=2)
+            yield header, np.char.strip(block)
+
+
+def _column(header, name, path):
+    if name not in header:
+        raise ValueError(f"Falta la columna '{name}' en {path}")
+    return header.index(name)
+
+
+def _edge_chunks_csv(path, chunk_size, nodes, default_weight):
+    """Bloques (origen, destino, peso) de un CSV source,target[,weight]"""
+    for header, block in _read_csv_chunks(path, chunk_size):
+        src = nodes.encode(block[:, _column(header, 'source', path)])
+        dst = nodes.encode(block[:, _column(header, 'target', path)])
+        if 'weight' in header:
+            weights = block[:, header.index('weight')].astype(np.float64)
+        else:
+            weights = np.full(len(src), default_weight, dtype=np.float64)
+        yield src, dst, weights
+
+
+def _edge_chunks_npz(path, chunk_size, nodes, default_weight):
+    """
+    Bloques (origen, destino, peso) de un .npz con arreglos source, target y
+    opcionalmente weight, node_ids y node_types
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if 'node_ids' in data.files:
+            types = data['node_types'] if 'node_types' in data.files else None
+            for i, name in enumerate(data['node_ids']):
+                nodes.add(str(name), str(types[i]) if types is not None else 'client')
+        source, target = data['source'], data['target']
+        weight = data['weight'] if 'weight' in data.files else None
+        for start in range(0, len(source), chunk_size):
+            stop = start + chunk_size
+            src = nodes.encode(source[start:stop].astype(str))
+            dst = nodes.encode(target[start:stop].astype(str))
+            if weight is not None:
+                weights = weight[start:stop].astype(np.float64)
+            else:
+                weights = np.full(len(src), default_weight, dtype=np.float64)
+            yield src, dst, weights
+
+
+def _dedup(src, dst, weights, directed):
+    """
+    Elimina lazos y aristas repetidas (conserva la primera aparición)
+
+    En grafos no dirigidos (u, v) y (v, u) son la misma arista.
+    """
+    keep = src != dst
+    src, dst, weights = src[keep], dst[keep], weights[keep]
+    if not directed:
+        src, dst = np.minimum(src, dst), np.maximum(src, dst)
+    n = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+    _, first = np.unique(src * n + dst, return_index=True)
+    first.sort()
+    return src[first], dst[first], weights[first]
+
+
+def _merge(merged, parts, directed):
+    """Agrega bloques deduplicados a las aristas acumuladas (estas van primero)"""
+    parts = [merged] + parts
+    return _dedup(np.concatenate([p[0] for p in parts]),
+                  np.concatenate([p[1] for p in parts]),
+                  np.concatenate([p[2] for p in parts]), directed)
+
+
+def _csr_from_arrays(vertices, src, dst, weights, directed) -> CSRGraph:
+    """Instantánea CSR construida directamente desde los arreglos de aristas"""
+    if not directed:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        weights = np.concatenate([weights, weights])
+    order = np.argsort(src, kind='stable')
+    integral = weights.size == 0 or (
+        weights.min() >= 0 and weights.max() <= CSRGraph.BUCKET_MAX_WEIGHT
+        and bool(np.all(weights == np.floor(weights))))
+    bound = int(weights.max(initial=0)) if integral else -1
+    indptr = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(vertices)), out=indptr[1:])
+    return CSRGraph(vertices,
+                    array('q', indptr.tobytes()),
+                    array('q', dst[order].astype(np.int64).tobytes()),
+                    array('d', weights[order].astype(np.float64).tobytes()),
+                    directed, int_weight_bound=bound)
+
+
+def load_edge_list(edges_path: str, nodes_path: Optional[str] = None, directed=False,
+                   chunk_size=500_000, default_weight=1.0, build_snapshot=False):
+    """
+    Carga un grafo desde una lista de aristas en CSV o NPZ
+
+    El archivo se procesa por bloques: cada bloque se convierte a arreglos de
+    NumPy (los nombres de nodo se codifican a ids enteros) y se deduplica. Los
+    bloques se fusionan con las aristas ya acumuladas cuando suman más filas
+    que ellas, así que la memoria de la lectura queda acotada por las aristas
+    distintas más un bloque (y no por el archivo completo cuando hay muchas
+    repeticiones). Solo los nombres distintos de nodo pasan a ser objetos de
+    Python antes de construir el Graph.
+
+    Args:
+        edges_path: CSV con encabezado source,target[,weight] o .npz con
+            arreglos source, target y opcionalmente weight, node_ids, node_types
+        nodes_path: CSV opcional con encabezado id,type; los nodos que solo
+            aparecen en las aristas quedan como 'client'
+        directed: Si el grafo es dirigido
+        chunk_size: Filas por bloque
+        default_weight: Peso de las aristas si no hay columna weight
+        build_snapshot: Si es True también construye la instantánea CSR, que
+            se entrega como DijkstraRouter(graph, snapshot=...) o
+            Simulation(graph, snapshot=...) para no recorrer el grafo otra vez
+
+    Returns:
+        Graph, o tupla (Graph, CSRGraph) si build_snapshot es True
+    """
+    nodes = _NodeTable()
+    if nodes_path:
+        for header, block in _read_csv_chunks(nodes_path, chunk_size):
+            ids = block[:, _column(header, 'id', nodes_path)]
+            types = block[:, _column(header, 'type', nodes_path)]
+            for name, node_type in zip(ids.tolist(), types.tolist()):
+                nodes.add(name, node_type)
+
+    if edges_path.endswith('.npz'):
+        chunks = _edge_chunks_npz(edges_path, chunk_size, nodes, default_weight)
+    else:
+        chunks = _edge_chunks_csv(edges_path, chunk_size, nodes, default_weight)
+
+    src = dst = np.empty(0, dtype=np.int64)
+    weights = np.empty(0, dtype=np.float64)
+    parts, pending = [], 0
+    for chunk in chunks:
+        parts.append(_dedup(*chunk, directed))
+        pending += len(parts[-1][0])
+        if pending > max(len(src), chunk_size):
+            src, dst, weights = _merge((src, dst, weights), parts, directed)
+            parts, pending = [], 0
+    if parts:
+        src, dst, weights = _merge((src, dst, weights), parts, directed)
+    del parts
+
+    graph = Graph(directed)
+    vertices = graph.insert_vertices(nodes.names, nodes.types)
+    for start in range(0, len(src), chunk_size):
+        stop = start + chunk_size
+        graph.insert_edges(zip(map(vertices.__getitem__, src[start:stop].tolist()),
+                               map(vertices.__getitem__, dst[start:stop].tolist()),
+                               weights[start:stop].tolist()))
+
+    if build_snapshot:
+        return graph, _csr_from_arrays(list(vertices), src, dst, weights, directed)
+    return graph
@@ -1,46 +1,142 @@
-import random
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 from model import Graph
 
+# Candidatos por bloque; fijo para que el resultado no dependa de los procesos
+_BLOCK_SIZE = 1 << 16
+
+
+def _draw_block(entropy, block, n_nodes, block_size):
+    """
+    Genera un bloque de aristas candidatas (u, v, peso)
+
+    Cada bloque tiene su propio generador derivado de (entropy, block), así
+    que el bloque es el mismo sin importar qué proceso lo calcule.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(block,)))
+    u = rng.integers(0, n_nodes, block_size)
+    v = rng.integers(0, n_nodes, block_size)
+    weights = rng.integers(1, 11, block_size)
+    return u, v, weights
+
+
+def _first_unique(keys):
+    """Posiciones de la primera aparición de cada clave, en orden original"""
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    return first
+
+
 class SimulationInitializer:
     @staticmethod
-    def create_connected_graph(n_nodes, m_edges):
-        """Crea un grafo conexo con roles asignados"""
+    def create_connected_graph(n_nodes, m_edges, seed=None, workers=1):
+        """
+        Crea un grafo conexo con roles asignados y exactamente m_edges aristas
+
+        Un camino que recorre todos los nodos asegura la conexidad; el resto
+        de las aristas se sortean por bloques con NumPy, se deduplican de forma
+        vectorizada y se sortean bloques adicionales hasta completar m_edges.
+
+        Args:
+            n_nodes: Número de nodos
+            m_edges: Número de aristas (entre n_nodes - 1 y n_nodes * (n_nodes - 1) / 2)
+            seed: Semilla; con la misma semilla el grafo es idéntico
+            workers: Procesos para sortear los bloques (None = núcleos
+                disponibles); no cambia el resultado
+        """
         if m_edges < n_nodes - 1:
             raise ValueError("Aristas insuficientes para grafo conexo")
-        
-        g = Graph()
-        nodes = []
-        
+        max_edges = n_nodes * (n_nodes - 1) // 2
+        if m_edges > max_edges:
+            raise ValueError(f"Un grafo de {n_nodes} nodos admite a lo más {max_edges} aristas")
+
         # Crear nodos con roles
         n_warehouses = int(n_nodes * 0.2)
         n_recharge = int(n_nodes * 0.2)
         n_clients = n_nodes - n_warehouses - n_recharge
-        
-        # Agregar nodos de almacenamiento
-        for i in range(n_warehouses):
-            node = g.insert_vertex(f"Warehouse_{i}", "warehouse")
-            nodes.append(node)
-        
-        # Agregar nodos de recarga
-        for i in range(n_recharge):
-            node = g.insert_vertex(f"Recharge_{i}", "recharge")
-            nodes.append(node)
-        
-        # Agregar nodos cliente
-        for i in range(n_clients):
-            node = g.insert_vertex(f"Client_{i}", "client")
-            nodes.append(node)
-        
+
+        names = ([f"Warehouse_{i}" for i in range(n_warehouses)] +
+                 [f"Recharge_{i}" for i in range(n_recharge)] +
+                 [f"Client_{i}" for i in range(n_clients)])
+        types = (["warehouse"] * n_warehouses + ["recharge"] * n_recharge +
+                 ["client"] * n_clients)
+
+        g = Graph()
+        nodes = g.insert_vertices(names, types)
+
+        entropy = np.random.SeedSequence(seed).entropy
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(0,)))
+
         # Conectar el grafo para asegurar conexidad
-        for i in range(1, n_nodes):
-            weight = random.randint(1, 10)
-            g.insert_edge(nodes[i-1], nodes[i], weight)
-        
+        src = np.arange(0, n_nodes - 1, dtype=np.int64)
+        dst = src + 1
+        weights = rng.integers(1, 11, n_nodes - 1)
+
         # Agregar aristas adicionales aleatorias
-        for _ in range(m_edges - (n_nodes - 1)):
-            u, v = random.sample(nodes, 2)
-            weight = random.randint(1, 10)
-            if not g.get_edge(u, v):
-                g.insert_edge(u, v, weight)
-        
-        return g
\ No newline at end of file
+        extra = m_edges - (n_nodes - 1)
+        if extra > 0:
+            if extra * 2 > max_edges - (n_nodes - 1):
+                u, v, w = SimulationInitializer._dense_pairs(n_nodes, extra, rng)
+            else:
+                u, v, w = SimulationInitializer._sparse_pairs(n_nodes, extra, entropy, workers)
+            src = np.concatenate([src, u])
+            dst = np.concatenate([dst, v])
+            weights = np.concatenate([weights, w])
+
+        g.insert_edges(zip(map(nodes.__getitem__, src.tolist()),
+                           map(nodes.__getitem__, dst.tolist()),
+                           weights.tolist()))
+        return g
+
+    @staticmethod
+    def _dense_pairs(n_nodes, extra, rng):
+        """Elige extra pares sin repetición entre todos los que no están en el camino"""
+        u, v = np.triu_indices(n_nodes, 1)
+        free = v != u + 1
+        u, v = u[free], v[free]
+        chosen = rng.permutation(len(u))[:extra]
+        return u[chosen], v[chosen], rng.integers(1, 11, extra)
+
+    @staticmethod
+    def _sparse_pairs(n_nodes, extra, entropy, workers):
+        """Sortea bloques de candidatos hasta reunir extra pares distintos"""
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        keys = np.empty(0, dtype=np.int64)
+        weights = np.empty(0, dtype=np.int64)
+        next_block = 1  # El bloque 0 es el generador del camino
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while len(keys) < extra:
+                missing = extra - len(keys)
+                n_blocks = -(-int(missing * 1.2) // _BLOCK_SIZE)
+                blocks = range(next_block, next_block + n_blocks)
+                next_block += n_blocks
+                args = [(entropy, b, n_nodes, _BLOCK_SIZE) for b in blocks]
+                if pool is None:
+                    drawn = [_draw_block(*a) for a in args]
+                else:
+                    drawn = list(pool.map(_draw_block, *zip(*args)))
+
+                u = np.concatenate([d[0] for d in drawn])
+                v = np.concatenate([d[1] for d in drawn])
+                w = np.concatenate([d[2] for d in drawn])
+                low, high = np.minimum(u, v), np.maximum(u, v)
+                # Sin lazos ni pares que ya están en el camino
+                valid = high > low + 1
+                new_keys = low[valid] * n_nodes + high[valid]
+
+                keys = np.concatenate([keys, new_keys])
+                weights = np.concatenate([weights, w[valid]])
+                first = _first_unique(keys)
+                keys, weights = keys[first], weights[first]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        keys, weights = keys[:extra], weights[:extra]
+        return keys // n_nodes, keys % n_nodes, weights
@@ -0,0 +1,206 @@
+import heapq
+from typing import Dict, Optional
+
+from tda.hash_map import HashMap
+
+
+class OrderStore:
+    """
+    Órdenes de la simulación agrupadas por estado
+
+    Cada orden vive en un solo pool según su estado: 'active' (pending o
+    in_transit), 'completed' o 'failed'. Los pools son diccionarios
+    order_id -> orden, así que mover una orden de pool o eliminarla es O(1) y
+    se recorren en orden de creación. El orders_map es el registro de todas
+    las órdenes por order_id.
+
+    Índices secundarios, también diccionarios order_id -> orden:
+    - (origen, destino) -> órdenes activas entre ese par
+    - destino -> todas las órdenes con ese destino
+
+    Las órdenes activas de cada par (origen, destino) además están en un
+    montículo (priority, secuencia) para obtener la más urgente en O(log n);
+    las entradas que dejan de ser válidas (la orden salió del pool 'active',
+    se eliminó o cambió su priority y se llamó a refresh) se descartan al
+    consultarlo.
+    """
+    POOLS = ('active', 'completed', 'failed')
+
+    def __init__(self, orders_map: Optional[HashMap] = None):
+        self.orders_map = orders_map if orders_map is not None else HashMap()
+        self._pools: Dict[str, dict] = {pool: {} for pool in self.POOLS}
+        self._pool_of: Dict[str, str] = {}     # order_id -> pool actual
+        self._by_pair: Dict[tuple, dict] = {}         # (origen, destino) -> órdenes activas
+        self._by_destination: Dict[object, dict] = {}  # destino -> órdenes
+        self._heaps: Dict[tuple, list] = {}   # (origen, destino) -> [(priority, secuencia, order_id)]
+        self._queued: Dict[str, tuple] = {}   # order_id -> (priority, secuencia) vigente
+        self._seq = 0
+        self._created = 0
+
+    @staticmethod
+    def pool_for(status) -> str:
+        """Pool que corresponde a un estado de orden"""
+        if status == "completed":
+            return 'completed'
+        if status == "failed":
+            return 'failed'
+        return 'active'
+
+    def next_id(self) -> str:
+        """Id para la próxima orden (no se reutilizan aunque se eliminen órdenes)"""
+        # Tras cargar una instantánea con órdenes eliminadas el contador puede
+        # quedar atrás de algún id existente
+        while f"ORD_{self._created + 1}" in self._pool_of:
+            self._created += 1
+        return f"ORD_{self._created + 1}"
+
+    @property
+    def created(self) -> int:
+        """Órdenes creadas en total, incluidas las eliminadas"""
+        return self._created
+
+    def reserve_ids(self, count):
+        """Evita que next_id reutilice los primeros count ids (órdenes ya eliminadas)"""
+        self._created = max(self._created, count)
+
+    def add(self, order):
+        """Registra una orden en el orders_map y en el pool de su estado"""
+        if order.order_id in self._pool_of:
+            raise ValueError(f"La orden {order.order_id} ya existe")
+        self.orders_map.put(order.order_id, order)
+        self._created += 1
+        self._by_destination.setdefault(order.destination, {})[order.order_id] = order
+        self._file(order)
+        return order
+
+    def get(self, order_id):
+        return self.orders_map.get(order_id)
+
+    def remove(self, order_id):
+        """Elimina una orden por id y la retorna (None si no existe)"""
+        order = self.orders_map.remove(order_id)
+        if order is None:
+            return None
+        self._unfile(order)
+        del self._pool_of[order_id]
+        self._dequeue(order)
+        _discard(self._by_destination, order.destination, order_id)
+        return order
+
+    # ---------- Transiciones de estado ----------
+
+    def set_status(self, order, status):
+        """Cambia el estado de la orden y la mueve al pool correspondiente"""
+        order.status = status
+        self.refresh(order)
+
+    def complete(self, order, cost):
+        """Completa la orden (Order.complete) y la pasa al pool 'completed'"""
+        order.complete(cost)
+        self.refresh(order)
+
+    def refresh(self, order):
+        """Vuelve a ubicar una orden cuyo estado se cambió directamente"""
+        if order.order_id not in self._pool_of:
+            raise KeyError(f"La orden {order.order_id} no está en el almacén")
+        self._unfile(order)
+        self._file(order)
+
+    def _file(self, order):
+        pool = self.pool_for(order.status)
+        self._pools[pool][order.order_id] = order
+        self._pool_of[order.order_id] = pool
+        if pool == 'active':
+            pair = (order.origin, order.destination)
+            self._by_pair.setdefault(pair, {})[order.order_id] = order
+            queued = self._queued.get(order.order_id)
+            if queued is None or queued[0] != order.priority:
+                self._queued[order.order_id] = (order.priority, self._seq)
+                heapq.heappush(self._heaps.setdefault(pair, []),
+                               (order.priority, self._seq, order.order_id))
+                self._seq += 1
+        else:
+            self._dequeue(order)
+
+    def _unfile(self, order):
+        pool = self._pool_of[order.order_id]
+        del self._pools[pool][order.order_id]
+        if pool == 'active':
+            _discard(self._by_pair, (order.origin, order.destination), order.order_id)
+
+    def _dequeue(self, order):
+        """Invalida la entrada de la orden en el montículo de su par"""
+        if self._queued.pop(order.order_id, None) is None:
+            return
+        pair = (order.origin, order.destination)
+        bucket = self._by_pair.get(pair)
+        if bucket is None:
+            self._heaps.pop(pair, None)
+        elif len(self._heaps[pair]) > 2 * len(bucket) + 16:
+            # Demasiadas entradas inválidas: se reconstruye con las vigentes
+            heap = [self._queued[order_id] + (order_id,) for order_id in bucket]
+            heapq.heapify(heap)
+            self._heaps[pair] = heap
+
+    # ---------- Prioridad ----------
+
+    def most_urgent_between(self, origin, destination):
+        """
+        Orden activa más urgente de origin a destination (menor priority,
+        luego la más antigua), o None si no hay
+        """
+        heap = self._heaps.get((origin, destination))
+        if not heap:
+            return None
+        queued = self._queued
+        while heap and queued.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+        return self.orders_map.get(heap[0][2]) if heap else None
+
+    # ---------- Vistas ----------
+
+    def pool(self, name):
+        """Vista (sin copia) de las órdenes de un pool"""
+        return self._pools[name].values()
+
+    def active(self):
+        return self._pools['active'].values()
+
+    def completed(self):
+        return self._pools['completed'].values()
+
+    def failed(self):
+        return self._pools['failed'].values()
+
+    def count(self, name) -> int:
+        return len(self._pools[name])
+
+    def active_between(self, origin, destination):
+        """Vista de las órdenes activas de origin a destination"""
+        return self._by_pair.get((origin, destination), {}).values()
+
+    def to_destination(self, destination):
+        """Vista de todas las órdenes (de cualquier estado) hacia destination"""
+        return self._by_destination.get(destination, {}).values()
+
+    def count_to(self, destination) -> int:
+        return len(self._by_destination.get(destination, ()))
+
+    def __contains__(self, order_id):
+        return order_id in self._pool_of
+
+    def __len__(self):
+        return len(self._pool_of)
+
+    def __iter__(self):
+        for pool in self.POOLS:
+            yield from self._pools[pool].values()
+
+
+def _discard(index, key, order_id):
+    """Quita order_id de index[key] y borra la entrada si queda vacía"""
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(order_id, None)
+        if not bucket:
+            del index[key]
@@ -0,0 +1,130 @@
+import heapq
+import time
+from math import inf
+from typing import Dict, List, Optional, Tuple
+
+from sim.csr_graph import dijkstra_csr, reconstruct_path
+
+
+class RechargeTables:
+    """
+    Tablas precalculadas de distancias y árboles de predecesores desde cada
+    estación de recarga
+
+    Con las tablas, una ruta con recargas se resuelve con una sola búsqueda
+    desde el origen más un Dijkstra sobre el grafo reducido de estaciones
+    (origen -> estación -> ... -> estación -> destino), donde cada tramo debe
+    caber en la batería.
+    """
+
+    def __init__(self, snapshot, stations: List[int], battery_limit: float):
+        """
+        Args:
+            snapshot: Instantánea CSR del grafo
+            stations: Índices (en la instantánea) de las estaciones de recarga
+            battery_limit: Costo máximo recorrible entre recargas
+        """
+        started = time.perf_counter()
+        self.snapshot = snapshot
+        self.stations = list(stations)
+        self.battery_limit = battery_limit
+        self.distances = []
+        self.predecessors = []
+
+        for station in self.stations:
+            distances, predecessors = dijkstra_csr(snapshot, station)
+            self.distances.append(distances)
+            self.predecessors.append(predecessors)
+
+        # Grafo reducido: estación -> [(estación alcanzable, distancia)]
+        self.station_links = []
+        for pos, distances in enumerate(self.distances):
+            self.station_links.append([
+                (other, distances[station])
+                for other, station in enumerate(self.stations)
+                if other != pos and distances[station] <= battery_limit
+            ])
+
+        self.build_seconds = time.perf_counter() - started
+
+    def route(self, origin_distances, origin_predecessors,
+              target: int) -> Optional[Tuple[List[int], float]]:
+        """
+        Ruta óptima con recargas usando el árbol de caminos mínimos del origen
+
+        Args:
+            origin_distances: Distancias desde el origen (búsqueda completa)
+            origin_predecessors: Predecesores desde el origen
+            target: Índice del nodo destino
+
+        Returns:
+            Tupla (path en índices, costo) o None si no existe ruta factible
+        """
+        limit = self.battery_limit
+        if origin_distances[target] <= limit:
+            # Ninguna ruta con recargas puede ser más corta que la directa
+            return reconstruct_path(origin_predecessors, target), origin_distances[target]
+
+        best_cost = inf
+        best_last = -1
+
+        # Dijkstra sobre estaciones partiendo de las alcanzables desde el origen
+        cost = [inf] * len(self.stations)
+        previous = [-1] * len(self.stations)
+        pq = []
+        for pos, station in enumerate(self.stations):
+            d = origin_distances[station]
+            if d <= limit:
+                cost[pos] = d
+                pq.append((d, pos))
+        heapq.heapify(pq)
+
+        done = bytearray(len(self.stations))
+        while pq:
+            d, pos = heapq.heappop(pq)
+            if d >= best_cost:
+                break
+            if done[pos]:
+                continue
+            done[pos] = 1
+
+            to_target = self.distances[pos][target]
+            if to_target <= limit and d + to_target < best_cost:
+                best_cost = d + to_target
+                best_last = pos
+
+            for other, leg in self.station_links[pos]:
+                nd = d + leg
+                if nd < cost[other]:
+                    cost[other] = nd
+                    previous[other] = pos
+                    heapq.heappush(pq, (nd, other))
+
+        if best_cost == inf:
+            return None
+
+        chain = []
+        pos = best_last
+        while pos != -1:
+            chain.append(pos)
+            pos = previous[pos]
+        chain.reverse()
+
+        path = reconstruct_path(origin_predecessors, self.stations[chain[0]])
+        for i, pos in enumerate(chain):
+            end = self.stations[chain[i + 1]] if i + 1 < len(chain) else target
+            path.extend(reconstruct_path(self.predecessors[pos], end)[1:])
+        return path, best_cost
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por las tablas de distancias y predecesores"""
+        return sum(buf.itemsize * len(buf) for buf in self.distances + self.predecessors)
+
+    def stats(self) -> Dict:
+        """Resumen de tamaño y costo de construcción de las tablas"""
+        return {
+            "stations": len(self.stations),
+            "station_links": sum(len(links) for links in self.station_links),
+            "memory_bytes": self.memory_bytes(),
+            "build_seconds": self.build_seconds,
+        }
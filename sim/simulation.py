@@ -1,44 +1,99 @@
 import random
-from collections import deque
 from tda.AVL_base import AVL
 from tda.hash_map import HashMap
 from domain.client import Client
 from domain.order import Order
 from domain.route import Route
 from sim.dijkstra import DijkstraRouter  # 👈 NUEVA IMPORTACIÓN
+from sim.order_store import OrderStore
+from sim.recharge_tables import RechargeTables
+from sim.snapshot import save_simulation, load_simulation
 
 class Simulation:
-    def __init__(self, graph):
+    def __init__(self, graph, snapshot=None):
         self.graph = graph
         self.clients = []
         self.route_avl = AVL()  # AVL para rutas frecuentes
         self.orders_map = HashMap()  # Mapa de órdenes
-        self.active_orders = []
-        self.completed_orders = []
+        self.orders = OrderStore(self.orders_map)  # Pools por estado + cola de despacho
+        self._clients_at = {}  # Nodo -> clientes vinculados (contadores de órdenes)
         self.battery_limit = 50
-        self.recharge_stations = [v for v in self.graph.vertices() 
-                                if self.graph.get_node_type(v) == 'recharge']
         
         # 👈 NUEVA LÍNEA: Inicializar router de Dijkstra
-        self.dijkstra_router = DijkstraRouter(graph)
+        self.dijkstra_router = DijkstraRouter(graph, snapshot=snapshot)
+        self._recharge_tables = None
+        self._recharge_tables_key = None
     
+    def save(self, path):
+        """Guarda grafo, router, órdenes, clientes y rutas en un archivo binario"""
+        save_simulation(self, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carga una simulación guardada con save (lectura vía mmap)"""
+        return load_simulation(path, cls)
+
+    @property
+    def active_orders(self):
+        """Órdenes pendientes o en vuelo (vista del almacén, sin copia)"""
+        return self.orders.active()
+
+    @property
+    def completed_orders(self):
+        """Órdenes completadas (vista del almacén, sin copia)"""
+        return self.orders.completed()
+
+    @property
+    def failed_orders(self):
+        """Órdenes sin ruta factible (vista del almacén, sin copia)"""
+        return self.orders.failed()
+
+    @property
+    def recharge_stations(self):
+        """Estaciones de recarga (índice del grafo, siempre actualizado)"""
+        return self.graph.vertices_by_type('recharge')
+
     def generate_order(self, origin=None, destination=None, priority=None):
         """Genera una nueva orden con parámetros opcionales o aleatorios"""
-        order_id = f"ORD_{len(self.orders_map) + 1}"
+        order_id = self.orders.next_id()
         
-        warehouses = [v for v in self.graph.vertices() 
-                    if self.graph.get_node_type(v) == 'warehouse']
-        clients = [v for v in self.graph.vertices() 
-                 if self.graph.get_node_type(v) == 'client']
-        
-        origin = origin or random.choice(warehouses)
-        destination = destination or random.choice(clients)
+        origin = origin or self.graph.vertices_by_type('warehouse').random_choice()
+        destination = destination or self.graph.vertices_by_type('client').random_choice()
         priority = priority or random.randint(1, 5)
         
         new_order = Order(order_id, origin, destination, priority)
-        self.active_orders.append(new_order)
-        self.orders_map.put(order_id, new_order)
+        self.orders.add(new_order)
+        for client in self._clients_at.get(destination, ()):
+            client.total_orders += 1
         return new_order
+
+    def remove_order(self, order_id):
+        """Elimina una orden por id y descuenta a los clientes de su destino"""
+        order = self.orders.remove(order_id)
+        if order is not None:
+            for client in self._clients_at.get(order.destination, ()):
+                client.total_orders -= 1
+        return order
+
+    def link_client(self, client, node):
+        """
+        Vincula un cliente a un nodo; su total_orders pasa a ser el número de
+        órdenes hacia ese nodo y se actualiza al crear o eliminar órdenes
+        """
+        previous = getattr(client, "node_id", None)
+        if previous is not None and client in self._clients_at.get(previous, ()):
+            self._clients_at[previous].remove(client)
+        client.node_id = node
+        self._clients_at.setdefault(node, []).append(client)
+        client.total_orders = self.orders.count_to(node)
+
+    def orders_between(self, origin, destination):
+        """Órdenes activas de origin a destination (vista del índice, O(1))"""
+        return self.orders.active_between(origin, destination)
+
+    def orders_for_client(self, client):
+        """Órdenes de cualquier estado con destino en el nodo del cliente"""
+        return self.orders.to_destination(getattr(client, "node_id", None))
     
     def generate_clients(self, client_id=None, name=None, type_=None, total_orders=0):
         """Genera un nuevo cliente con parámetros opcionales o aleatorios"""
@@ -71,91 +126,156 @@ class Simulation:
             existing.value.increment_frequency()
         else:
             self.route_avl.insert(route_str, route)
+
+    def _register_routes(self, routes):
+        """Registra un lote de rutas con una sola búsqueda en el AVL por ruta distinta"""
+        grouped = {}
+        for route in routes:
+            route_str = route.path_str()
+            if route_str in grouped:
+                grouped[route_str][1] += 1
+            else:
+                grouped[route_str] = [route, 1]
+
+        for route_str, (route, count) in grouped.items():
+            existing = self.route_avl.search(route_str)
+            if existing:
+                existing.value.frequency += count
+            else:
+                route.frequency += count - 1
+                self.route_avl.insert(route_str, route)
     
-    # 👈 NUEVA FUNCIÓN: Reemplaza find_route_with_recharge con Dijkstra
     def find_route_with_recharge(self, start, end):
-        """Encuentra ruta usando Dijkstra con consideración de batería"""
-        # Primero intentar ruta directa con Dijkstra
-        result = self.dijkstra_router.find_shortest_path(start, end)
-        
-        if result:
-            path, cost = result
-            
-            # Verificar si la ruta es factible con batería
-            if self._is_route_feasible(path, cost):
-                route = Route(path, cost)
-                self._register_route(route)
-                return route
-            else:
-                # Si no es factible, buscar ruta con recarga
-                return self._find_route_with_recharge_dijkstra(start, end)
-        
-        return None
+        """Encuentra la ruta óptima considerando batería y cualquier número de recargas"""
+        tables = self.get_recharge_tables()
+        index = self.dijkstra_router.snapshot.index
+        if start not in index or end not in index:
+            return None
+
+        # Una búsqueda desde el origen (cacheada por el router) más
+        # consultas a las tablas de las estaciones
+        distances, predecessors = self.dijkstra_router.shortest_path_tree(index[start])
+        route = self._route_from_tree(tables, distances, predecessors, start, end)
+        if route:
+            self._register_route(route)
+        return route
+
+    def find_alternative_routes_with_recharge(self, start, end, k=3, max_candidates=50):
+        """
+        Encuentra hasta k rutas alternativas factibles con la batería
+
+        Recorre las rutas simples en orden de costo (Yen) y conserva las que
+        no superan battery_limit entre estaciones de recarga. Como solo se
+        consideran rutas simples, una ruta óptima que requiera desviarse a una
+        estación y volver por el mismo camino no aparece entre las alternativas.
+
+        Args:
+            start: Vértice origen
+            end: Vértice destino
+            k: Número máximo de rutas a retornar
+            max_candidates: Máximo de rutas examinadas antes de rendirse
+
+        Returns:
+            Lista de Route ordenada por costo
+        """
+        recharge = self.recharge_stations
+        routes = []
+        if k <= 0 or max_candidates <= 0:
+            return routes
+        examined = 0
+        # Se corta justo al completar k rutas o max_candidates: reanudar el
+        # generador lanzaría otra ronda de búsquedas de desvío
+        for path, cost in self.dijkstra_router.iter_shortest_paths(start, end):
+            examined += 1
+            if self.is_path_feasible(path, recharge):
+                routes.append(Route(path, cost))
+                if len(routes) == k:
+                    break
+            if examined == max_candidates:
+                break
+        return routes
+
+    def route_orders(self, orders):
+        """
+        Calcula las rutas de un lote de órdenes
+
+        Agrupa las órdenes por almacén de origen y hace una sola búsqueda por
+        origen distinto; cada destino se responde desde ese árbol (o con las
+        tablas de recarga si la batería no alcanza).
+
+        Returns:
+            Lista de Route (o None si no hay ruta) en el mismo orden que orders
+        """
+        orders = list(orders)
+        tables = self.get_recharge_tables()
+        index = self.dijkstra_router.snapshot.index
+
+        by_origin = {}
+        for pos, order in enumerate(orders):
+            by_origin.setdefault(order.origin, []).append(pos)
+
+        routes = [None] * len(orders)
+        for origin, positions in by_origin.items():
+            if origin not in index:
+                continue
+            distances, predecessors = self.dijkstra_router.shortest_path_tree(index[origin])
+            for pos in positions:
+                destination = orders[pos].destination
+                if destination in index:
+                    routes[pos] = self._route_from_tree(
+                        tables, distances, predecessors, origin, destination)
+
+        self._register_routes([route for route in routes if route])
+        return routes
+
+    def _route_from_tree(self, tables, distances, predecessors, start, end):
+        """Construye la ruta start -> end a partir del árbol de caminos mínimos de start"""
+        if start == end:
+            return Route([start], 0.0)
+
+        snapshot = self.dijkstra_router.snapshot
+        result = tables.route(distances, predecessors, snapshot.index[end])
+        if result is None:
+            return None
+        path, cost = result
+        return Route([snapshot.vertices[i] for i in path], cost)
+
+    def get_recharge_tables(self):
+        """
+        Retorna las tablas de distancias desde las estaciones de recarga
+
+        Se reconstruyen solo si cambió el grafo (lo que incluye las estaciones)
+        o el límite de batería.
+        """
+        snapshot = self.dijkstra_router.sync()
+        key = (self.graph.version, self.battery_limit)
+        if self._recharge_tables is None or self._recharge_tables_key != key:
+            stations = [snapshot.index[v] for v in self.recharge_stations if v in snapshot.index]
+            self._recharge_tables = RechargeTables(snapshot, stations, self.battery_limit)
+            self._recharge_tables_key = key
+        return self._recharge_tables
     
     def _is_route_feasible(self, path, cost):
         """Verifica si la ruta es factible con la batería disponible"""
         return cost <= self.battery_limit
     
-    def _find_route_with_recharge_dijkstra(self, start, end):
-        """Busca ruta con recarga usando Dijkstra"""
-        best_route = None
-        best_cost = float('inf')
-        
-        # Probar cada estación de recarga
-        for recharge_station in self.recharge_stations:
-            # Ruta: start -> recharge_station -> end
-            
-            # Primera parte: start -> recharge_station
-            result1 = self.dijkstra_router.find_shortest_path(start, recharge_station)
-            if not result1:
-                continue
-                
-            path1, cost1 = result1
-            if not self._is_route_feasible(path1, cost1):
-                continue
-            
-            # Segunda parte: recharge_station -> end
-            result2 = self.dijkstra_router.find_shortest_path(recharge_station, end)
-            if not result2:
-                continue
-                
-            path2, cost2 = result2
-            if not self._is_route_feasible(path2, cost2):
-                continue
-            
-            # Combinar rutas
-            combined_path = path1 + path2[1:]  # Evitar duplicar recharge_station
-            combined_cost = cost1 + cost2
-            
-            if combined_cost < best_cost:
-                best_cost = combined_cost
-                best_route = Route(combined_path, combined_cost)
-        
-        if best_route:
-            self._register_route(best_route)
-        
-        return best_route
-    
-    def _find_path_to_recharge(self, current, visited):
-        """BFS para encontrar la estación de recarga más cercana"""
-        queue = deque()
-        queue.append((current, [current]))
-        local_visited = set(visited)
-        
-        while queue:
-            node, path = queue.popleft()
-            
-            if node in self.recharge_stations:
-                return path
-            
-            if node not in local_visited:
-                local_visited.add(node)
-                
-                for neighbor in self.graph.neighbors(node):
-                    if neighbor not in local_visited:
-                        queue.append((neighbor, path + [neighbor]))
-        return None
-    
+    def is_path_feasible(self, path, recharge, battery_limit=None, initial_charge=None):
+        """
+        Verifica que ningún tramo entre recargas supere la batería
+
+        initial_charge es la carga al despegar (None = batería completa); el
+        primer tramo hasta una estación se vuela con esa carga.
+        """
+        limit = self.battery_limit if battery_limit is None else battery_limit
+        used = 0 if initial_charge is None else limit - initial_charge
+        for u, v in zip(path, path[1:]):
+            used += self.graph.get_edge(u, v).element()
+            if used > limit:
+                return False
+            if v in recharge:
+                used = 0
+        return True
+
     def get_most_frequent_routes(self, n=5):
         """Obtiene las n rutas más frecuentes"""
         return self.route_avl.get_most_frequent(n)
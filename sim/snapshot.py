@@ -0,0 +1,267 @@
+import json
+import mmap
+import struct
+from array import array
+from datetime import datetime
+
+from domain.client import Client
+from domain.order import Order
+from domain.route import Route
+from model import Graph
+from sim.csr_graph import CSRGraph
+
+# Encabezado fijo: firma, versión del formato, reservado, largo del encabezado JSON
+MAGIC = b'DRONESIM'
+FORMAT_VERSION = 2  # 2: órdenes fallidas (failed_orders) y contador de ids
+_READABLE_VERSIONS = (1, 2)
+_PREFIX = struct.Struct('<8sIIQ')
+_ALIGN = 8
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_container(path, meta, sections):
+    """
+    Escribe encabezado JSON + secciones binarias alineadas a 8 bytes
+
+    Args:
+        meta: Diccionario serializable con metadatos
+        sections: Diccionario nombre -> array de array o bytes
+    """
+    table = {}
+    offset = 0
+    for name, data in sections.items():
+        if isinstance(data, array):
+            table[name] = {"offset": offset, "typecode": data.typecode, "count": len(data)}
+            size = data.itemsize * len(data)
+        else:
+            table[name] = {"offset": offset, "typecode": None, "count": len(data)}
+            size = len(data)
+        offset = _align(offset + size)
+
+    header = json.dumps({"meta": meta, "sections": table}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header)))
+        f.write(header)
+        f.write(b'\0' * (_align(f.tell()) - f.tell()))
+        start = f.tell()
+        for name, data in sections.items():
+            f.write(b'\0' * (start + table[name]["offset"] - f.tell()))
+            f.write(data.tobytes() if isinstance(data, array) else data)
+
+
+class _Container:
+    """Lectura de un archivo de instantánea a través de mmap"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} no es una instantánea de simulación")
+        if version not in _READABLE_VERSIONS:
+            self._mm.close()
+            raise ValueError(f"Versión de instantánea no soportada: {version}")
+        header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_len])
+        self.meta = header["meta"]
+        self._sections = header["sections"]
+        self._start = _align(_PREFIX.size + header_len)
+
+    def array(self, name) -> array:
+        """Copia la sección a un array (una sola copia de memoria, sin parseo)"""
+        info = self._sections[name]
+        result = array(info["typecode"])
+        start = self._start + info["offset"]
+        with memoryview(self._mm) as view:
+            result.frombytes(view[start:start + result.itemsize * info["count"]])
+        return result
+
+    def bytes(self, name) -> bytes:
+        info = self._sections[name]
+        start = self._start + info["offset"]
+        return self._mm[start:start + info["count"]]
+
+    def close(self):
+        self._mm.close()
+
+
+def _route_to_json(route, position):
+    path = [position.get(v, -1) for v in route.path]
+    if -1 in path:
+        return None  # La ruta pasa por vértices que ya no están en el grafo
+    return {"path": path, "cost": route.cost, "frequency": route.frequency}
+
+
+def _order_to_json(order, position, routes):
+    route = None
+    if order.route is not None:
+        route = routes.get(id(order.route))
+        if route is None:
+            route = _route_to_json(order.route, position)
+    return {
+        "order_id": order.order_id,
+        "origin": position.get(order.origin, -1),
+        "destination": position.get(order.destination, -1),
+        "priority": order.priority,
+        "status": order.status,
+        "cost": order.cost,
+        "route": route,
+        "completed_at": order.completed_at.isoformat() if order.completed_at else None,
+    }
+
+
+def save_simulation(sim, path):
+    """
+    Guarda la simulación completa en un archivo binario versionado
+
+    Secciones binarias: nombres y tipos de vértices, aristas (origen,
+    destino, peso) y la instantánea CSR del router. Órdenes, clientes y el
+    contenido del AVL de rutas van en una sección JSON que referencia a los
+    vértices por su posición.
+    """
+    graph = sim.graph
+    vertices = list(graph.vertices())
+    position = {v: i for i, v in enumerate(vertices)}
+
+    names = [str(v.element()) for v in vertices]
+    if any('\0' in name for name in names):
+        raise ValueError("Los nombres de vértice no pueden contener '\\0'")
+    type_names = sorted(set(graph.get_node_type(v) for v in vertices))
+    type_code = {t: i for i, t in enumerate(type_names)}
+
+    edges = list(graph.edges())
+    edge_src = array('q', (position[e.endpoints()[0]] for e in edges))
+    edge_dst = array('q', (position[e.endpoints()[1]] for e in edges))
+    edge_weight = array('d', (e.element() for e in edges))
+
+    snapshot = sim.dijkstra_router.sync().compacted()
+    csr_vertex = array('q', (-1 if v is None else position[v] for v in snapshot.vertices))
+
+    routes = {}
+    route_entries = []
+
+    def collect(node):
+        encoded = _route_to_json(node.value, position)
+        if encoded is not None:
+            routes[id(node.value)] = encoded
+            route_entries.append({"key": node.key, "route": encoded})
+    sim.route_avl.inorder_traversal(collect)
+
+    clients = []
+    for client in sim.clients:
+        entry = client.to_dict()
+        node = getattr(client, "node_id", None)
+        entry["node"] = position.get(node, -1) if node is not None else None
+        clients.append(entry)
+
+    objects = {
+        "active_orders": [_order_to_json(o, position, routes) for o in sim.active_orders],
+        "completed_orders": [_order_to_json(o, position, routes) for o in sim.completed_orders],
+        "failed_orders": [_order_to_json(o, position, routes) for o in sim.failed_orders],
+        "orders_created": sim.orders.created,
+        "clients": clients,
+        "routes": route_entries,
+    }
+
+    meta = {
+        "directed": graph.is_directed(),
+        "battery_limit": sim.battery_limit,
+        "type_names": type_names,
+        "integer_weights": all(isinstance(e.element(), int) for e in edges),
+        "int_weight_bound": snapshot.int_weight_bound,
+        "saved_at": datetime.now().isoformat(),
+    }
+    sections = {
+        "vertex_names": '\0'.join(names).encode('utf-8'),
+        "vertex_types": array('B', (type_code[graph.get_node_type(v)] for v in vertices)),
+        "edge_src": edge_src,
+        "edge_dst": edge_dst,
+        "edge_weight": edge_weight,
+        "csr_vertex": csr_vertex,
+        "csr_indptr": snapshot.indptr,
+        "csr_indices": snapshot.indices,
+        "csr_weights": snapshot.weights,
+        "objects": json.dumps(objects).encode('utf-8'),
+    }
+    _write_container(path, meta, sections)
+
+
+def load_simulation(path, simulation_cls):
+    """
+    Carga una simulación guardada con save_simulation
+
+    Los buffers numéricos se leen desde el mmap y la instantánea CSR se entrega
+    directamente al router, así que no se recorre el grafo ni se recalculan
+    rutas al abrir el archivo.
+    """
+    container = _Container(path)
+    try:
+        meta = container.meta
+        type_names = meta["type_names"]
+        types = [type_names[code] for code in container.array("vertex_types")]
+        names = container.bytes("vertex_names").decode('utf-8').split('\0') if types else []
+
+        graph = Graph(meta["directed"])
+        vertices = graph.insert_vertices(names, types)
+
+        weights = container.array("edge_weight").tolist()
+        if meta["integer_weights"]:
+            weights = [int(w) for w in weights]
+        graph.insert_edges(zip(map(vertices.__getitem__, container.array("edge_src")),
+                               map(vertices.__getitem__, container.array("edge_dst")),
+                               weights))
+
+        csr_vertices = [vertices[p] if p >= 0 else None for p in container.array("csr_vertex")]
+        index = {v: i for i, v in enumerate(csr_vertices) if v is not None}
+        snapshot = CSRGraph(csr_vertices, container.array("csr_indptr"),
+                            container.array("csr_indices"), container.array("csr_weights"),
+                            meta["directed"], index, int_weight_bound=meta["int_weight_bound"])
+        objects = json.loads(container.bytes("objects"))
+    finally:
+        container.close()
+
+    sim = simulation_cls(graph, snapshot=snapshot)
+    sim.battery_limit = meta["battery_limit"]
+
+    def vertex(pos):
+        return vertices[pos] if pos is not None and pos >= 0 else None
+
+    def decode_route(entry):
+        route = Route([vertices[p] for p in entry["path"]], entry["cost"])
+        route.frequency = entry["frequency"]
+        return route
+
+    # Las órdenes comparten el objeto Route del AVL cuando es la misma ruta
+    routes_by_key = {}
+    for entry in objects["routes"]:
+        route = decode_route(entry["route"])
+        sim.route_avl.insert(entry["key"], route)
+        routes_by_key[route.path_str()] = route
+
+    def decode_order(entry):
+        route = None
+        if entry["route"] is not None:
+            route = decode_route(entry["route"])
+            route = routes_by_key.get(route.path_str(), route)
+        completed_at = entry["completed_at"]
+        order = Order(entry["order_id"], vertex(entry["origin"]), vertex(entry["destination"]),
+                      entry["priority"], entry["status"], entry["cost"], route,
+                      datetime.fromisoformat(completed_at) if completed_at else None)
+        sim.orders.add(order)
+
+    for key in ("active_orders", "completed_orders", "failed_orders"):
+        for entry in objects.get(key, ()):
+            decode_order(entry)
+    sim.orders.reserve_ids(objects.get("orders_created", 0))
+
+    sim.clients = []
+    for entry in objects["clients"]:
+        client = Client(entry["client_id"], entry["name"], entry["type"], entry["total_orders"])
+        if entry["node"] is not None:
+            sim.link_client(client, vertex(entry["node"]))
+            client.total_orders = entry["total_orders"]
+        sim.clients.append(client)
+    return sim
@@ -1,11 +1,29 @@
 class HashMap:
+    """
+    Tabla hash con encadenamiento
+
+    Cuando el número de elementos supera LOAD_FACTOR * size se duplica la
+    cantidad de buckets, así que put, get, remove y la pertenencia son O(1)
+    en promedio.
+    """
+    LOAD_FACTOR = 0.75
+
     def __init__(self, size=10):
         self.size = size
         self.buckets = [[] for _ in range(size)]
+        self._count = 0
     
     def _hash(self, key):
         return hash(key) % self.size
     
+    def _resize(self, size):
+        old = self.buckets
+        self.size = size
+        self.buckets = [[] for _ in range(size)]
+        for bucket in old:
+            for key, value in bucket:
+                self.buckets[self._hash(key)].append((key, value))
+    
     def put(self, key, value):
         h = self._hash(key)
         bucket = self.buckets[h]
@@ -14,6 +32,9 @@ class HashMap:
                 bucket[i] = (key, value)
                 return
         bucket.append((key, value))
+        self._count += 1
+        if self._count > self.LOAD_FACTOR * self.size:
+            self._resize(self.size * 2)
     
     def get(self, key):
         h = self._hash(key)
@@ -22,6 +43,35 @@ class HashMap:
                 return v
         return None
     
+    def remove(self, key):
+        """Elimina la clave y retorna su valor (None si no estaba)"""
+        bucket = self.buckets[self._hash(key)]
+        for i, (k, v) in enumerate(bucket):
+            if k == key:
+                bucket[i] = bucket[-1]
+                bucket.pop()
+                self._count -= 1
+                return v
+        return None
+    
+    def __contains__(self, key):
+        return any(k == key for k, _ in self.buckets[self._hash(key)])
+    
+    def items(self):
+        for bucket in self.buckets:
+            yield from bucket
+    
+    def keys(self):
+        for k, _ in self.items():
+            yield k
+    
+    def values(self):
+        for _, v in self.items():
+            yield v
+    
+    def __iter__(self):
+        return self.keys()
+    
     #len 
     def __len__(self):
-        return sum(len(bucket) for bucket in self.buckets)
\ No newline at end of file
+        return self._count
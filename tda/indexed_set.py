@@ -0,0 +1,49 @@
+import random
+
+
+class IndexedSet:
+    """
+    Conjunto con inserción, eliminación, pertenencia y muestreo aleatorio en O(1)
+
+    Los elementos se guardan en una lista y un diccionario recuerda la
+    posición de cada uno; al eliminar, el último elemento ocupa el hueco.
+    """
+
+    def __init__(self, items=()):
+        self._items = []
+        self._positions = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item in self._positions:
+            return
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, item):
+        pos = self._positions.pop(item)
+        last = self._items.pop()
+        if pos < len(self._items):
+            self._items[pos] = last
+            self._positions[last] = pos
+
+    def discard(self, item):
+        if item in self._positions:
+            self.remove(item)
+
+    def random_choice(self, rng=random):
+        """Elemento aleatorio (IndexError si el conjunto está vacío)"""
+        return rng.choice(self._items)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
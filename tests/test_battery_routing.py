@@ -0,0 +1,75 @@
+import itertools
+import random
+from math import inf
+
+import pytest
+
+from domain.order import Order
+from model import Graph
+from sim.init_simulation import SimulationInitializer
+from sim.simulation import Simulation
+
+
+def _brute_force_cost(graph, start, end, battery, stations):
+    """
+    Costo mínimo con recargas relajando todos los estados (nodo, batería
+    usada) hasta que ninguno mejore; los pesos son enteros
+    """
+    best = {(start, 0): 0}
+    changed = True
+    while changed:
+        changed = False
+        for (node, used), cost in list(best.items()):
+            for edge in graph.incident_edges(node):
+                weight = edge.element()
+                if used + weight > battery:
+                    continue
+                nxt = edge.opposite(node)
+                state = (nxt, 0 if nxt in stations else used + weight)
+                if cost + weight < best.get(state, inf):
+                    best[state] = cost + weight
+                    changed = True
+    return min((cost for (node, _), cost in best.items() if node == end), default=None)
+
+
+def _route_cost(graph, path):
+    return sum(graph.get_edge(u, v).element() for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("seed,battery", [(1, 8), (2, 12), (3, 20)])
+def test_recharge_routes_match_brute_force(seed, battery):
+    graph = SimulationInitializer.create_connected_graph(25, 45, seed=seed)
+    sim = Simulation(graph)
+    sim.battery_limit = battery
+    stations = set(sim.recharge_stations)
+    rng = random.Random(seed)
+    pairs = rng.sample(list(itertools.permutations(graph.vertices(), 2)), 60)
+
+    batch = sim.route_orders([Order(f"ORD_{i}", u, v, 1) for i, (u, v) in enumerate(pairs)])
+    for (start, end), batched in zip(pairs, batch):
+        expected = _brute_force_cost(graph, start, end, battery, stations)
+        route = sim.find_route_with_recharge(start, end)
+        for found in (route, batched):
+            if expected is None:
+                assert found is None
+                continue
+            assert found.cost == expected
+            assert found.path[0] is start and found.path[-1] is end
+            assert _route_cost(graph, found.path) == expected
+            assert sim.is_path_feasible(found.path, stations)
+
+
+def test_recharge_route_detours_through_station():
+    # A -> B -> C cuesta 10 pero la batería es 6: hay que desviarse de B a
+    # la estación R y volver a B, repitiendo el nodo
+    graph = Graph()
+    a, b, c, r = graph.insert_vertices(["A", "B", "C", "R"],
+                                       ["warehouse", "client", "client", "recharge"])
+    graph.insert_edges([(a, b, 5), (b, c, 5), (b, r, 1)])
+    sim = Simulation(graph)
+    sim.battery_limit = 6
+
+    route = sim.find_route_with_recharge(a, c)
+    assert route.path == [a, b, r, b, c] and route.cost == 12
+    assert route.cost == _brute_force_cost(graph, a, c, 6, set(sim.recharge_stations))
+    assert sim.is_path_feasible(route.path, sim.recharge_stations)
@@ -0,0 +1,44 @@
+from math import inf
+
+from model import Graph
+from sim.csr_graph import CSRGraph, dijkstra_csr
+from sim.dijkstra import DijkstraRouter
+
+
+def _path_graph(n):
+    graph = Graph()
+    vertices = graph.insert_vertices([f"N{i}" for i in range(n)])
+    graph.insert_edges((vertices[i], vertices[i + 1], i + 1) for i in range(n - 1))
+    return graph, vertices
+
+
+def test_compacted_renumbers_without_removed_slots():
+    graph, vertices = _path_graph(6)
+    csr = CSRGraph.from_graph(graph)
+    csr.remove_vertex(vertices[2])
+    csr.remove_arc(1, 2)
+    csr.remove_arc(3, 2)
+
+    compact = csr.compacted()
+    assert not compact.has_removed()
+    assert compact.vertices == [v for v in vertices if v is not vertices[2]]
+    assert compact.index == {v: i for i, v in enumerate(compact.vertices)}
+    distances, _ = dijkstra_csr(compact, compact.index[vertices[3]])
+    assert distances[compact.index[vertices[5]]] == 4 + 5
+    assert distances[compact.index[vertices[0]]] == inf
+
+
+def test_distance_matrix_skips_removed_vertices():
+    graph, vertices = _path_graph(6)
+    router = DijkstraRouter(graph)
+    router.sync()
+    graph.remove_vertex(vertices[2])
+
+    matrix, index = router.distance_matrix()
+    assert matrix.shape == (5, 5)
+    assert set(index) == set(vertices) - {vertices[2]}
+
+    distances = router.get_distance_matrix()
+    assert all(None not in pair for pair in distances)
+    assert distances[(vertices[3], vertices[5])] == 4 + 5
+    assert (vertices[0], vertices[3]) not in distances
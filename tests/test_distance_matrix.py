@@ -0,0 +1,29 @@
+import numpy as np
+
+from sim.csr_graph import CSRGraph, dijkstra_csr
+from sim.dijkstra import DijkstraRouter
+from sim.distance_matrix import compute_distance_matrix
+from sim.init_simulation import SimulationInitializer
+
+
+def _reference(csr):
+    return np.array([list(dijkstra_csr(csr, source, queue='heap')[0])
+                     for source in range(len(csr))])
+
+
+def test_serial_and_parallel_matrices_match_dijkstra():
+    graph = SimulationInitializer.create_connected_graph(150, 400, seed=9)
+    csr = CSRGraph.from_graph(graph)
+    expected = _reference(csr)
+    assert np.array_equal(compute_distance_matrix(csr), expected)
+    assert np.array_equal(compute_distance_matrix(csr, workers=2, chunk_size=32), expected)
+
+
+def test_router_matrix_apis_agree():
+    graph = SimulationInitializer.create_connected_graph(40, 90, seed=1)
+    router = DijkstraRouter(graph)
+    matrix, index = router.distance_matrix()
+    pairs = router.get_distance_matrix()
+    assert len(pairs) == len(index) ** 2
+    for (u, v), distance in pairs.items():
+        assert matrix[index[u], index[v]] == distance
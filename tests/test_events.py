@@ -0,0 +1,67 @@
+import random
+
+from model import Graph
+from sim.events import EventEngine, EventKind
+from sim.init_simulation import SimulationInitializer
+from sim.simulation import Simulation
+
+
+def _engine(seed=3):
+    random.seed(seed)  # generate_order sortea origen, destino y prioridad
+    graph = SimulationInitializer.create_connected_graph(150, 400, seed=seed)
+    sim = Simulation(graph)
+    sim.battery_limit = 30
+    engine = EventEngine(sim, speed=2.0, recharge_time=3.0)
+    engine.schedule_arrivals(200, rate=4.0, seed=seed)
+    return sim, engine
+
+
+def test_step_and_run_give_the_same_stats():
+    _, by_run = _engine()
+    by_run.run()
+    _, by_step = _engine()
+    while by_step.step():
+        pass
+
+    ran, stepped = by_run.stats(), by_step.stats()
+    assert stepped["events_per_second"] > 0
+    for key in ("clock", "events_processed", "event_counts", "delivered", "failed",
+                "latency_mean", "latency_max"):
+        assert ran[key] == stepped[key]
+    assert by_step.wall_seconds > 0
+
+
+def test_run_restores_router_cache_limit():
+    sim, engine = _engine()
+    cache = sim.dijkstra_router.tree_cache
+    limit = cache.max_entries
+    engine.run(max_events=50)
+    assert cache.max_entries == limit
+    engine.run()
+    assert cache.max_entries == limit
+    assert engine.stats()["delivered"] + engine.stats()["failed"] == 200
+
+
+def test_single_trip_timeline_with_recharge():
+    # W -6- R -6- C con batería 10: hay que recargar en R
+    graph = Graph()
+    w, r, c = graph.insert_vertices(["W", "R", "C"], ["warehouse", "recharge", "client"])
+    graph.insert_edges([(w, r, 6), (r, c, 6)])
+    sim = Simulation(graph)
+    sim.battery_limit = 10
+    engine = EventEngine(sim, speed=2.0, recharge_time=5.0)
+    order = sim.generate_order(w, c, 1)
+    timeline = []
+    engine.subscribe(lambda at, kind, _: timeline.append((at, kind)))
+    engine.submit_order(order)
+    engine.run()
+
+    assert order.status == "completed"
+    assert timeline == [
+        (0.0, EventKind.ORDER_ARRIVAL), (0.0, EventKind.TAKEOFF),
+        (3.0, EventKind.ARRIVE_NODE), (3.0, EventKind.RECHARGE_START),
+        (8.0, EventKind.RECHARGE_END), (11.0, EventKind.ARRIVE_NODE),
+        (11.0, EventKind.DELIVERY),
+    ]
+    assert engine.stats()["latency_max"] == 11.0
+    assert sim.orders.count('completed') == 1
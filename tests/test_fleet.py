@@ -0,0 +1,197 @@
+import pytest
+
+from model import Graph
+from sim.events import EventEngine, EventKind
+from sim.fleet import Fleet
+from sim.init_simulation import SimulationInitializer
+from sim.simulation import Simulation
+
+
+def _line_sim(battery):
+    """Camino W0-W1-R0-R1-R2-R3-C con aristas de peso 8 y un dron con base en W0"""
+    graph = Graph()
+    names = ["W0", "W1", "R0", "R1", "R2", "R3", "C"]
+    types = ["warehouse", "warehouse", "recharge", "recharge", "recharge", "recharge", "client"]
+    nodes = dict(zip(names, graph.insert_vertices(names, types)))
+    graph.insert_edges((nodes[u], nodes[v], 8) for u, v in zip(names, names[1:]))
+    sim = Simulation(graph)
+    sim.battery_limit = battery
+    return sim, nodes
+
+
+def _run(sim, fleet, engine):
+    """Ejecuta el motor verificando que ningún dron vuele dos viajes a la vez"""
+    in_flight = set()
+
+    def watch(_, kind, data):
+        if kind == EventKind.TAKEOFF:
+            assert data.drone.drone_id not in in_flight, "dron con dos viajes simultáneos"
+            in_flight.add(data.drone.drone_id)
+        elif kind == EventKind.DRONE_RETURN:
+            in_flight.remove(data.drone_id)
+        elif kind == EventKind.ARRIVE_NODE:
+            assert data.charge >= 0
+
+    engine.subscribe(watch)
+    engine.run()
+    return in_flight
+
+
+def test_busy_drone_is_not_dispatched_before_it_returns():
+    # La estimación de available_at no incluye las recargas en ruta; el
+    # segundo pedido llega cuando la estimación ya venció pero el dron sigue
+    # recargando en R2
+    sim, nodes = _line_sim(battery=16)
+    engine = EventEngine(sim, recharge_time=20)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    drone = fleet.add_drone(nodes["W0"])
+    fleet.attach(engine)
+
+    first = sim.generate_order(nodes["W1"], nodes["C"], 1)
+    second = sim.generate_order(nodes["W1"], nodes["C"], 1)
+    engine.submit_order(first, at=0.0)
+    engine.submit_order(second, at=130.0)
+    takeoffs = []
+    engine.subscribe(lambda at, kind, data: kind == EventKind.TAKEOFF and takeoffs.append(at))
+
+    assert _run(sim, fleet, engine) == set()
+    assert first.status == second.status == "completed"
+    assert drone.trips == 2 and not drone.busy
+    first_return = 88 + 48 + 20  # Entrega + vuelta a W0 + recarga
+    assert takeoffs[1] >= first_return
+    assert 0 < fleet.stats()["utilization"] <= 1
+
+
+def test_deadhead_spends_battery():
+    # Con batería 10 el traslado W0 -> W1 deja 2 de carga y el primer tramo
+    # W1 -> R0 cuesta 8: ningún dron puede volar la orden y falla
+    sim, nodes = _line_sim(battery=10)
+    engine = EventEngine(sim, recharge_time=20)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    drone = fleet.add_drone(nodes["W0"])
+    fleet.attach(engine)
+
+    order = sim.generate_order(nodes["W1"], nodes["C"], 1)
+    engine.submit_order(order)
+    engine.run()
+    assert drone.trips == 0
+    assert order.status == "failed" and engine.failed == 1
+    assert fleet.pending_orders() == 0
+
+
+def test_borrows_drone_when_own_drones_cannot_fly():
+    # C2 cuelga de W1 con una arista de 6: el dron de W1 (batería 5) nunca
+    # puede volarla, el de W0 (batería 16) sí tras el traslado de 8
+    sim, nodes = _line_sim(battery=16)
+    nodes["C2"] = sim.graph.insert_vertex("C2", "client")
+    sim.graph.insert_edge(nodes["W1"], nodes["C2"], 6)
+    engine = EventEngine(sim, recharge_time=1)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    big = fleet.add_drone(nodes["W0"], battery_limit=16)
+    small = fleet.add_drone(nodes["W1"], battery_limit=5)
+    fleet.attach(engine)
+
+    # La segunda llega con big ocupado: espera en la cola de W0
+    orders = [sim.generate_order(nodes["W1"], nodes["C2"], 1) for _ in range(2)]
+    for order in orders:
+        engine.submit_order(order, at=0.0)
+    flown = []
+    engine.subscribe(lambda _, kind, trip: kind == EventKind.TAKEOFF
+                     and flown.append((trip.drone, trip.deadhead)))
+
+    assert _run(sim, fleet, engine) == set()
+    assert all(order.status == "completed" for order in orders)
+    assert flown == [(big, 8), (big, 8)]
+    assert small.trips == 0 and fleet.pending_orders() == 0
+
+
+def test_deadhead_is_measured_from_home_on_directed_graphs():
+    # H -> O cuesta 1 pero O -> H cuesta 50: el traslado desde la base es 1
+    graph = Graph(directed=True)
+    h, o, c = graph.insert_vertices(["H", "O", "C"], ["warehouse", "warehouse", "client"])
+    graph.insert_edges([(h, o, 1), (o, h, 50), (o, c, 5), (c, h, 10)])
+    sim = Simulation(graph)
+    sim.battery_limit = 40
+    engine = EventEngine(sim, recharge_time=1)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    drone = fleet.add_drone(h)
+    fleet.attach(engine)
+
+    order = sim.generate_order(o, c, 1)
+    engine.submit_order(order)
+    deadheads = []
+    engine.subscribe(lambda _, kind, trip: kind == EventKind.TAKEOFF
+                     and deadheads.append(trip.deadhead))
+
+    assert _run(sim, fleet, engine) == set()
+    assert order.status == "completed"
+    assert deadheads == [1] and drone.trips == 1
+
+
+def test_queued_order_goes_to_drone_free_first():
+    # W1 tiene un dron en un viaje largo; el de W0 vuelve antes y, aun con
+    # el traslado, despega primero
+    sim, nodes = _line_sim(battery=16)
+    engine = EventEngine(sim, recharge_time=1)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    near = fleet.add_drone(nodes["W0"])
+    own = fleet.add_drone(nodes["W1"])
+    fleet.attach(engine)
+
+    engine.submit_order(sim.generate_order(nodes["W0"], nodes["W1"], 1), at=0.0)  # near
+    engine.submit_order(sim.generate_order(nodes["W1"], nodes["C"], 1), at=0.0)   # own
+    order = sim.generate_order(nodes["W1"], nodes["R0"], 1)
+    engine.submit_order(order, at=1.0)
+    flown_by = {}
+    engine.subscribe(lambda _, kind, trip: kind == EventKind.TAKEOFF
+                     and flown_by.setdefault(trip.order.order_id, trip.drone))
+
+    assert _run(sim, fleet, engine) == set()
+    assert order.status == "completed"
+    assert flown_by[order.order_id] is near
+
+
+def test_infeasible_head_does_not_block_queue():
+    # C2 cuelga de W1 con una arista de 12: solo el dron grande la vuela
+    sim, nodes = _line_sim(battery=16)
+    nodes["C2"] = sim.graph.insert_vertex("C2", "client")
+    sim.graph.insert_edge(nodes["W1"], nodes["C2"], 12)
+    engine = EventEngine(sim, recharge_time=1)
+    fleet = Fleet(sim, drones_per_warehouse=0)
+    big = fleet.add_drone(nodes["W1"], battery_limit=16)
+    small = fleet.add_drone(nodes["W1"], battery_limit=8)
+    fleet.attach(engine)
+
+    engine.submit_order(sim.generate_order(nodes["W1"], nodes["C2"], 1), at=0.0)  # big
+    engine.submit_order(sim.generate_order(nodes["W1"], nodes["R0"], 1), at=0.0)  # small
+    # Ambos drones ocupados: quedan en cola, la urgente solo la vuela big
+    urgent = sim.generate_order(nodes["W1"], nodes["C2"], 1)
+    near = sim.generate_order(nodes["W1"], nodes["R0"], 5)
+    engine.submit_order(urgent, at=1.0)
+    engine.submit_order(near, at=1.0)
+    flown_by = {}
+    engine.subscribe(lambda _, kind, trip: kind == EventKind.TAKEOFF
+                     and flown_by.setdefault(trip.order.order_id, trip.drone))
+
+    assert _run(sim, fleet, engine) == set()
+    assert urgent.status == near.status == "completed"
+    assert flown_by[urgent.order_id] is big
+    # small vuelve primero (t=17) y toma la orden que puede volar
+    assert flown_by[near.order_id] is small
+    assert fleet.pending_orders() == 0
+
+
+@pytest.mark.parametrize("drones_per_warehouse", [1, 2])
+def test_fleet_delivers_every_feasible_order(drones_per_warehouse):
+    graph = SimulationInitializer.create_connected_graph(120, 300, seed=4)
+    sim = Simulation(graph)
+    sim.battery_limit = 25
+    engine = EventEngine(sim, speed=2.0, recharge_time=3.0)
+    fleet = Fleet(sim, drones_per_warehouse=drones_per_warehouse).attach(engine)
+    engine.schedule_arrivals(300, rate=5.0, seed=7)
+
+    assert _run(sim, fleet, engine) == set()
+    stats = engine.stats()
+    assert stats["delivered"] + stats["failed"] == 300
+    assert fleet.pending_orders() == 0
+    assert fleet.stats()["idle_drones"] == len(fleet.drones)
@@ -0,0 +1,68 @@
+import networkx as nx
+
+from model import Graph, GraphChange
+from visual.networkx_adapter import NetworkXAdapter
+
+
+def _chain(graph, n):
+    vertices = graph.insert_vertices([f"N{i}" for i in range(n)])
+    for i in range(n - 1):
+        graph.insert_edge(vertices[i], vertices[i + 1], i + 1)
+    return vertices
+
+
+def test_journal_is_empty_without_consumers():
+    graph = Graph()
+    _chain(graph, 50)
+    assert graph._journal == []
+    assert graph.changes_since(0) is None  # Historial no disponible: reconstruir
+
+
+def test_changes_since_replays_after_tracking():
+    graph = Graph()
+    vertices = _chain(graph, 5)
+    start = graph.version
+    graph.track_changes()
+    graph.remove_edge(vertices[0], vertices[1])
+    graph.insert_edge(vertices[0], vertices[4], 9)
+    kinds = [change.kind for change in graph.changes_since(start)]
+    assert kinds == [GraphChange.REMOVE_EDGE, GraphChange.INSERT_EDGE]
+    assert graph.changes_since(graph.version) == []
+
+
+def test_journal_limit_is_configurable():
+    graph = Graph(journal_limit=8)
+    vertices = _chain(graph, 3)
+    start = graph.version
+    graph.track_changes()
+    for weight in range(20):
+        graph.remove_edge(vertices[0], vertices[1])
+        graph.insert_edge(vertices[0], vertices[1], weight)
+    assert len(graph._journal) <= 8
+    assert graph.changes_since(start) is None
+
+    disabled = Graph(journal_limit=0)
+    _chain(disabled, 3)
+    disabled.track_changes()
+    disabled.insert_vertex("extra")
+    assert disabled._journal == []
+    assert disabled.changes_since(disabled.version - 1) is None
+
+
+def test_networkx_adapter_follows_changes():
+    graph = Graph()
+    vertices = _chain(graph, 6)
+    NetworkXAdapter.to_networkx(graph)
+    graph.remove_vertex(vertices[2])
+    extra = graph.insert_vertex("extra", "recharge")
+    graph.insert_edge(extra, vertices[5], 4)
+    graph.remove_edge(vertices[0], vertices[1])
+
+    updated = NetworkXAdapter.to_networkx(graph)
+    expected = nx.Graph()
+    expected.add_nodes_from(str(v) for v in graph.vertices())
+    expected.add_weighted_edges_from((str(e.endpoints()[0]), str(e.endpoints()[1]), e.element())
+                                     for e in graph.edges())
+    assert set(updated.nodes) == set(expected.nodes)
+    assert {frozenset(e) for e in updated.edges} == {frozenset(e) for e in expected.edges}
+    assert updated.nodes[str(extra)]["type"] == "recharge"
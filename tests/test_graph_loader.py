@@ -0,0 +1,40 @@
+from sim.csr_graph import CSRGraph, dijkstra_csr
+from sim.dijkstra import DijkstraRouter
+from sim.graph_loader import load_edge_list
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_chunks_are_deduplicated_keeping_first_weight(tmp_path):
+    edges = _write(tmp_path / "edges.csv",
+                   "source,target,weight\n"
+                   "a,b,1\nb,c,2\n"
+                   "b,a,9\nc,d,3\n"      # b-a repite a-b (no dirigido)
+                   "a,a,5\nc,d,7\n"      # lazo y repetición en otro bloque
+                   "d,e,4\n")
+    graph = load_edge_list(edges, chunk_size=2)
+    assert graph.num_vertices() == 5
+    assert graph.num_edges() == 4
+    by_name = {v.element(): v for v in graph.vertices()}
+    assert graph.get_edge(by_name["a"], by_name["b"]).element() == 1
+    assert graph.get_edge(by_name["c"], by_name["d"]).element() == 3
+
+
+def test_prebuilt_snapshot_is_used_by_router(tmp_path):
+    edges = _write(tmp_path / "edges.csv",
+                   "source,target,weight\n" +
+                   "".join(f"n{i},n{(i * 7 + 3) % 40},{i % 9 + 1}\n" for i in range(120)))
+    graph, snapshot = load_edge_list(edges, chunk_size=16, build_snapshot=True)
+    router = DijkstraRouter(graph, snapshot=snapshot)
+    assert router.snapshot is snapshot
+    assert router.sync() is snapshot
+
+    reference = CSRGraph.from_graph(graph)
+    for v in list(graph.vertices())[:10]:
+        expected, _ = dijkstra_csr(reference, reference.index[v])
+        distances, _ = dijkstra_csr(snapshot, snapshot.index[v])
+        assert {u: distances[snapshot.index[u]] for u in graph.vertices()} == \
+               {u: expected[reference.index[u]] for u in graph.vertices()}
@@ -0,0 +1,69 @@
+import itertools
+
+from model import Graph
+from sim.dijkstra import DijkstraRouter
+from sim.init_simulation import SimulationInitializer
+from sim.simulation import Simulation
+
+
+def _simple_paths(graph, start, end):
+    """Todas las rutas simples de start a end con su costo (fuerza bruta)"""
+    paths = []
+
+    def extend(path, cost):
+        node = path[-1]
+        if node == end:
+            paths.append((path, cost))
+            return
+        for edge in graph.incident_edges(node):
+            nxt = edge.opposite(node)
+            if nxt not in path:
+                extend(path + [nxt], cost + edge.element())
+
+    extend([start], 0)
+    return paths
+
+
+def test_k_shortest_paths_matches_brute_force():
+    graph = SimulationInitializer.create_connected_graph(9, 18, seed=11)
+    router = DijkstraRouter(graph)
+    vertices = list(graph.vertices())
+    for start, end in itertools.permutations(vertices[:5], 2):
+        expected = sorted(cost for _, cost in _simple_paths(graph, start, end))
+        found = router.k_shortest_paths(start, end, 6)
+        assert [cost for _, cost in found] == expected[:6]
+        assert len({tuple(path) for path, _ in found}) == len(found)
+
+
+def test_k_shortest_paths_stops_after_k():
+    graph = SimulationInitializer.create_connected_graph(30, 80, seed=2)
+    router = DijkstraRouter(graph)
+    start, end = list(graph.vertices())[0], list(graph.vertices())[-1]
+    assert router.k_shortest_paths(start, end, 0) == []
+
+    calls = []
+    original = router.iter_shortest_paths
+
+    def counting(*args):
+        for result in original(*args):
+            calls.append(result)
+            yield result
+    router.iter_shortest_paths = counting
+    assert len(router.k_shortest_paths(start, end, 3)) == 3
+    assert len(calls) == 3  # No se pidió una cuarta ruta
+
+
+def test_alternative_routes_respect_k_and_battery():
+    graph = Graph()
+    names = ["W", "A", "R", "B", "C"]
+    types = ["warehouse", "client", "recharge", "client", "client"]
+    w, a, r, b, c = graph.insert_vertices(names, types)
+    graph.insert_edges([(w, a, 6), (a, c, 6), (w, r, 5), (r, b, 5), (b, c, 5), (w, c, 30)])
+    sim = Simulation(graph)
+    sim.battery_limit = 10
+
+    routes = sim.find_alternative_routes_with_recharge(w, c, k=5)
+    assert [route.cost for route in routes] == [15]  # W-A-C (12) supera la batería
+    assert sim.find_alternative_routes_with_recharge(w, c, k=0) == []
+    sim.battery_limit = 30
+    assert [route.cost for route in sim.find_alternative_routes_with_recharge(w, c, k=2)] == [12, 15]
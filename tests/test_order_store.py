@@ -0,0 +1,137 @@
+import random
+
+import pytest
+
+from sim import snapshot as snapshot_format
+from sim.init_simulation import SimulationInitializer
+from sim.simulation import Simulation
+from tda.hash_map import HashMap
+
+
+def _sim(n_orders=200, seed=5):
+    random.seed(seed)
+    graph = SimulationInitializer.create_connected_graph(60, 150, seed=seed)
+    sim = Simulation(graph)
+    for i, node in enumerate(graph.vertices_by_type('client')):
+        sim.link_client(sim.generate_clients(client_id=f"CLI_{i}"), node)
+    sim.process_orders(n_orders)
+    return sim
+
+
+def _check_indexes(sim):
+    for client in sim.clients:
+        expected = [o for o in sim.orders if o.destination is client.node_id]
+        assert client.total_orders == len(expected)
+        assert set(sim.orders_for_client(client)) == set(expected)
+    pairs = {}
+    for order in sim.active_orders:
+        pairs.setdefault((order.origin, order.destination), set()).add(order)
+    for (origin, destination), orders in pairs.items():
+        assert set(sim.orders_between(origin, destination)) == orders
+        urgent = min(orders, key=lambda o: (o.priority, int(o.order_id[4:])))
+        assert sim.orders.most_urgent_between(origin, destination) is urgent
+
+
+def test_hash_map_resizes_and_removes():
+    table, reference = HashMap(), {}
+    rng = random.Random(1)
+    for i in range(3000):
+        key = rng.randrange(1000)
+        table.put(key, i)
+        reference[key] = i
+        if i % 3 == 0:
+            key = rng.randrange(1000)
+            assert table.remove(key) == reference.pop(key, None)
+    assert len(table) == len(reference)
+    assert dict(table.items()) == reference
+    assert all(key in table for key in reference)
+    assert table.size > 10 and len(table) <= table.LOAD_FACTOR * table.size
+
+
+def test_status_transitions_move_orders_between_pools():
+    sim = _sim()
+    order = sim.orders.get("ORD_7")
+    sim.orders.set_status(order, "in_transit")
+    assert order in set(sim.active_orders)
+    sim.orders.complete(order, 12.5)
+    assert order in set(sim.completed_orders) and order not in set(sim.active_orders)
+    failed = sim.orders.get("ORD_8")
+    sim.orders.set_status(failed, "failed")
+    assert list(sim.failed_orders) == [failed]
+    assert sim.orders.count('active') == 198
+    _check_indexes(sim)
+
+    assert sim.remove_order("ORD_9").order_id == "ORD_9"
+    assert "ORD_9" not in sim.orders and sim.orders_map.get("ORD_9") is None
+    assert sim.remove_order("ORD_9") is None
+    assert sim.generate_order().order_id == "ORD_201"
+    _check_indexes(sim)
+
+
+def test_indexes_follow_random_changes():
+    sim = _sim(400)
+    rng = random.Random(3)
+    for order_id in rng.sample([o.order_id for o in sim.orders], 150):
+        order = sim.orders.get(order_id)
+        action = rng.random()
+        if action < 0.3:
+            sim.orders.complete(order, 1.0)
+        elif action < 0.5:
+            sim.orders.set_status(order, "failed")
+        elif action < 0.7:
+            sim.remove_order(order_id)
+        else:
+            sim.orders.set_status(order, "in_transit")
+    _check_indexes(sim)
+
+
+def test_most_urgent_between_follows_priority_changes():
+    sim = _sim(0)
+    warehouse = sim.graph.vertices_by_type('warehouse')[0]
+    client = sim.graph.vertices_by_type('client')[0]
+    orders = [sim.generate_order(warehouse, client, priority) for priority in (3, 1, 2, 1)]
+    assert sim.orders.most_urgent_between(warehouse, client) is orders[1]
+
+    sim.orders.complete(orders[1], 1.0)
+    assert sim.orders.most_urgent_between(warehouse, client) is orders[3]
+    orders[0].priority = 0
+    sim.orders.refresh(orders[0])
+    assert sim.orders.most_urgent_between(warehouse, client) is orders[0]
+    sim.orders.set_status(orders[0], "in_transit")  # Sigue activa
+    assert sim.orders.most_urgent_between(warehouse, client) is orders[0]
+
+    for order in orders:
+        if order.order_id in sim.orders:
+            sim.remove_order(order.order_id)
+    assert sim.orders.most_urgent_between(warehouse, client) is None
+    assert not sim.orders._heaps and not sim.orders._queued
+
+
+def test_snapshot_round_trip_keeps_pools_and_counters(tmp_path):
+    sim = _sim()
+    sim.orders.complete(sim.orders.get("ORD_1"), 3.0)
+    sim.orders.set_status(sim.orders.get("ORD_2"), "failed")
+    sim.remove_order("ORD_200")
+    path = str(tmp_path / "sim.bin")
+    sim.save(path)
+
+    loaded = Simulation.load(path)
+    for name in ('active', 'completed', 'failed'):
+        assert [o.order_id for o in loaded.orders.pool(name)] == \
+               [o.order_id for o in sim.orders.pool(name)]
+    assert [c.total_orders for c in loaded.clients] == [c.total_orders for c in sim.clients]
+    _check_indexes(loaded)
+    assert loaded.generate_order().order_id == "ORD_201"
+
+
+def test_snapshot_version(tmp_path, monkeypatch):
+    sim = _sim(20)
+    path = str(tmp_path / "sim.bin")
+    monkeypatch.setattr(snapshot_format, "FORMAT_VERSION", 1)
+    sim.save(path)
+    assert Simulation.load(path).orders.count('active') == 20  # Formato anterior
+
+    monkeypatch.setattr(snapshot_format, "FORMAT_VERSION", 99)
+    sim.save(path)
+    with pytest.raises(ValueError):
+        Simulation.load(path)
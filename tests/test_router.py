@@ -0,0 +1,202 @@
+import gc
+import random
+from math import inf
+
+import networkx as nx
+import pytest
+
+from model import Graph
+from sim.csr_graph import CSRGraph, dijkstra_csr
+from sim.dijkstra import DijkstraRouter
+from sim.init_simulation import SimulationInitializer
+
+
+def _random_graph(n, m, seed, directed=False, integer=True):
+    rng = random.Random(seed)
+    graph = Graph(directed)
+    vertices = graph.insert_vertices([f"V{i}" for i in range(n)])
+    edges = {}
+    while len(edges) < m:
+        u, v = rng.sample(range(n), 2)
+        key = (u, v) if directed else (min(u, v), max(u, v))
+        edges.setdefault(key, rng.randint(1, 12) if integer else rng.uniform(0.5, 9.5))
+    graph.insert_edges((vertices[u], vertices[v], w) for (u, v), w in edges.items())
+    return graph
+
+
+def _reference(graph, source):
+    """Distancias de Dijkstra plano (networkx) desde source"""
+    nx_graph = nx.DiGraph() if graph.is_directed() else nx.Graph()
+    nx_graph.add_nodes_from(graph.vertices())
+    nx_graph.add_weighted_edges_from((*edge.endpoints(), edge.element()) for edge in graph.edges())
+    return nx.single_source_dijkstra_path_length(nx_graph, source)
+
+
+def _path_cost(graph, path):
+    return sum(graph.get_edge(u, v).element() for u, v in zip(path, path[1:]))
+
+
+def _check_router(graph, router, methods, sources=6, seed=0):
+    rng = random.Random(seed)
+    vertices = list(graph.vertices())
+    for source in rng.sample(vertices, min(sources, len(vertices))):
+        expected = _reference(graph, source)
+        for target in rng.sample(vertices, min(15, len(vertices))):
+            for method in methods:
+                result = router.find_shortest_path(source, target, method=method)
+                if target not in expected:
+                    assert result is None, method
+                    continue
+                path, distance = result
+                assert distance == pytest.approx(expected[target]), method
+                assert path[0] is source and path[-1] is target
+                assert _path_cost(graph, path) == pytest.approx(distance)
+
+
+def _coordinates(graph, seed):
+    rng = random.Random(seed)
+    return {v: (-38.7 + rng.uniform(-0.05, 0.05), -72.6 + rng.uniform(-0.05, 0.05))
+            for v in graph.vertices()}
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("integer", [True, False])
+def test_csr_dijkstra_matches_plain_dijkstra(directed, integer):
+    graph = _random_graph(120, 300, seed=4, directed=directed, integer=integer)
+    _check_router(graph, DijkstraRouter(graph), ['dijkstra'])
+
+
+def test_tree_cache_evicts_least_recently_used():
+    graph = _random_graph(120, 300, seed=4)
+    router = DijkstraRouter(graph, cache_entries=2)
+    for source in (0, 1, 0, 2):
+        router.shortest_path_tree(source)
+    assert sorted(key for key, _ in router.tree_cache.items()) == [0, 2]
+    _check_router(graph, router, ['dijkstra'])
+
+    uncached = DijkstraRouter(graph, cache_entries=0)
+    _check_router(graph, uncached, ['dijkstra'], seed=1)
+    assert len(uncached.tree_cache) == 0
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("integer", [True, False])
+def test_bidirectional_matches_plain_dijkstra(directed, integer):
+    graph = _random_graph(120, 300, seed=4, directed=directed, integer=integer)
+    _check_router(graph, DijkstraRouter(graph, method='bidirectional'), ['bidirectional'])
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("integer", [True, False])
+def test_astar_matches_plain_dijkstra(directed, integer):
+    graph = _random_graph(120, 300, seed=4, directed=directed, integer=integer)
+    router = DijkstraRouter(graph)
+    router.set_coordinates(_coordinates(graph, 4))
+    assert router.has_coordinates()
+    _check_router(graph, router, ['astar'])
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_contraction_hierarchy_matches_plain_dijkstra(integer):
+    graph = _random_graph(120, 300, seed=4, integer=integer)
+    router = DijkstraRouter(graph)
+    router.build_contraction_hierarchy()
+    _check_router(graph, router, ['ch'])
+
+    # La jerarquía de contracción solo admite grafos no dirigidos
+    directed = _random_graph(120, 300, seed=4, directed=True, integer=integer)
+    with pytest.raises(ValueError):
+        DijkstraRouter(directed).build_contraction_hierarchy()
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_incremental_updates_match_rebuild(directed):
+    graph = _random_graph(90, 200, seed=7, directed=directed)
+    router = DijkstraRouter(graph)
+    router.set_coordinates(_coordinates(graph, 7))
+    rng = random.Random(7)
+    for step in range(120):
+        vertices = list(graph.vertices())
+        action = rng.random()
+        if action < 0.35:
+            u, v = rng.sample(vertices, 2)
+            if graph.get_edge(u, v) is None:
+                graph.insert_edge(u, v, rng.randint(1, 12))
+        elif action < 0.65:
+            edge = rng.choice(list(graph.edges()))
+            u, v = edge.endpoints()
+            graph.remove_edge(u, v)
+            if rng.random() < 0.5:  # Cambio de peso
+                graph.insert_edge(u, v, rng.randint(1, 12))
+        elif action < 0.8:
+            new = graph.insert_vertex(f"X{step}")
+            graph.insert_edge(new, rng.choice(vertices), rng.randint(1, 12))
+        else:
+            graph.remove_vertex(rng.choice(vertices))
+        if step % 10 == 0:
+            # Consultas intermedias para que los árboles en caché se reparen
+            _check_router(graph, router, ['dijkstra'], sources=2, seed=step)
+
+    _check_router(graph, router, ['dijkstra', 'bidirectional', 'astar'], seed=99)
+    fresh = DijkstraRouter(graph)
+    _check_router(graph, fresh, ['dijkstra'], seed=99)
+
+
+def test_source_tree_matches_plain_dijkstra():
+    graph = _random_graph(80, 160, seed=2)
+    router = DijkstraRouter(graph)
+    source = next(iter(graph.vertices()))
+    tree = router.find_shortest_paths_from_source(source)
+    expected = _reference(graph, source)
+    for vertex in graph.vertices():
+        assert tree.distance_to(vertex) == pytest.approx(expected.get(vertex, inf))
+        path = tree.path_to(vertex)
+        if vertex in expected:
+            assert _path_cost(graph, path) == pytest.approx(expected[vertex])
+
+
+def test_bucket_and_heap_queues_agree():
+    graph = SimulationInitializer.create_connected_graph(300, 900, seed=6)
+    csr = CSRGraph.from_graph(graph)
+    assert csr.int_weight_bound != -1
+    for source in range(0, 300, 37):
+        heap = dijkstra_csr(csr, source, queue='heap')
+        bucket = dijkstra_csr(csr, source, queue='bucket')
+        assert list(heap[0]) == list(bucket[0])
+
+
+def test_source_tree_survives_graph_changes():
+    graph = _random_graph(80, 160, seed=2)
+    router = DijkstraRouter(graph)
+    source = next(iter(graph.vertices()))
+    tree = router.find_shortest_paths_from_source(source)
+    target = max(tree, key=tree.distance_to)
+    path, distance = tree[target]
+    assert len(path) > 2
+
+    # Quitar un vértice intermedio del camino no altera el árbol ya calculado
+    graph.remove_vertex(path[1])
+    new = graph.insert_vertex("NEW")
+    router.sync()
+    assert tree.path_to(target) == path and None not in tree.path_to(target)
+    assert tree.distance_to(target) == distance
+    assert path[1] in tree and new not in tree
+
+
+def test_router_releases_graph_subscription():
+    graph = _random_graph(40, 80, seed=3)
+    listeners = len(graph._listeners)
+    router = DijkstraRouter(graph)
+    assert len(graph._listeners) == listeners + 1
+    del router
+    gc.collect()
+    assert len(graph._listeners) == listeners
+
+    router = DijkstraRouter(graph)
+    router.close()
+    router.close()
+    assert len(graph._listeners) == listeners
+    vertices = list(graph.vertices())
+    graph.insert_edge(vertices[0], vertices[-1], 1)
+    # Sin suscripción la instantánea se reconstruye al consultar
+    _check_router(graph, router, ['dijkstra'])
@@ -0,0 +1,54 @@
+import networkx as nx
+import pytest
+
+from model import Graph, Vertex
+from model.traversal import VisitedSet, bfs_depths
+from sim.init_simulation import SimulationInitializer
+
+
+def _to_networkx(graph):
+    nx_graph = nx.DiGraph() if graph.is_directed() else nx.Graph()
+    nx_graph.add_nodes_from(graph.vertices())
+    nx_graph.add_edges_from(edge.endpoints() for edge in graph.edges())
+    return nx_graph
+
+
+def test_visited_set_rejects_vertices_without_id():
+    visited = VisitedSet(4)
+    loose = Vertex("suelto")
+    with pytest.raises(ValueError):
+        visited.add(loose)
+    assert loose not in visited
+    assert len(visited) == 0
+
+
+def test_bfs_depths_match_networkx():
+    graph = SimulationInitializer.create_connected_graph(200, 320, seed=8)
+    start = next(iter(graph.vertices()))
+    expected = nx.single_source_shortest_path_length(_to_networkx(graph), start)
+    assert dict(bfs_depths(graph, start)) == expected
+    assert set(graph.bfs(start)) == set(expected)
+    limited = dict(bfs_depths(graph, start, max_depth=2))
+    assert limited == {v: d for v, d in expected.items() if d <= 2}
+
+
+def test_dfs_and_bfs_reach_the_same_component():
+    graph = Graph()
+    vertices = graph.insert_vertices([f"N{i}" for i in range(8)])
+    graph.insert_edges([(vertices[0], vertices[1], 1), (vertices[1], vertices[2], 1),
+                        (vertices[2], vertices[0], 1), (vertices[4], vertices[5], 1)])
+    component = {vertices[0], vertices[1], vertices[2]}
+    assert set(graph.dfs(vertices[0])) == component
+    assert set(graph.bfs(vertices[0])) == component
+
+
+def test_topological_sort_respects_edges():
+    graph = Graph(directed=True)
+    vertices = graph.insert_vertices([f"T{i}" for i in range(30)])
+    edges = [(vertices[i], vertices[j], 1) for i in range(30) for j in range(i + 1, 30)
+             if (i * 7 + j * 3) % 5 == 0]
+    graph.insert_edges(edges)
+    order = graph.topological_sort()
+    position = {v: i for i, v in enumerate(order)}
+    assert len(order) == 30
+    assert all(position[u] < position[v] for u, v, _ in edges)
@@ -1,6 +1,5 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import networkx as nx
 from sim.simulation import Simulation
 from sim.init_simulation import SimulationInitializer
 from visual.networkx_adapter import NetworkXAdapter
@@ -29,6 +28,21 @@ def init_session_state():
     if 'explore_map_data' not in st.session_state:
         st.session_state.explore_map_data = None
 
+def refresh_base_map():
+    """Reconstruye el mapa base solo si el grafo cambió desde que se creó"""
+    graph = st.session_state.get('graph')
+    if graph is None or 'base_map' not in st.session_state:
+        return
+    if st.session_state.get('base_map_version') == graph.version:
+        return
+    coordinates = st.session_state.get('node_coordinates') or None
+    interactive_map, coordinates = st.session_state.map_builder.create_full_map(
+        graph, coordinates=coordinates
+    )
+    st.session_state.node_coordinates = coordinates
+    st.session_state.base_map = interactive_map
+    st.session_state.base_map_version = graph.version
+
 def display_persistent_map(map_obj, container_key, width=700, height=500):
     """
     Muestra un mapa de forma persistente usando contenedores
@@ -67,8 +81,11 @@ def run_simulation_tab():
     with col1:
         n_nodes = st.slider("Number of nodes", 10, 150, 15, key='nodes')
     with col2:
-        min_edges = max(n_nodes - 1, 10)
-        m_edges = st.slider("Number of edges", min_edges, 300, 20, key='edges')
+        # Un grafo simple de n nodos admite a lo más n(n-1)/2 aristas
+        max_edges = min(300, n_nodes * (n_nodes - 1) // 2)
+        min_edges = min(max(n_nodes - 1, 10), max_edges)
+        m_edges = st.slider("Number of edges", min_edges, max_edges,
+                            min(max(20, min_edges), max_edges), key='edges')
     
     n_orders = st.slider("Number of orders", 10, 500, 10, key='orders')
     
@@ -78,7 +95,8 @@ def run_simulation_tab():
             keys_to_clear = [
                 'node_coordinates', 'base_map', 'current_route_map',
                 'show_route', 'last_route', 'route_message', 'graph_pos',
-                'main_map_data', 'explore_map_data', 'route_algorithm'
+                'main_map_data', 'explore_map_data', 'route_algorithm',
+                'alternative_routes', 'base_map_version'
             ]
             for key in keys_to_clear:
                 if key in st.session_state:
@@ -90,30 +108,23 @@ def run_simulation_tab():
                 sim = Simulation(graph)
 
                 # Vincular clientes a nodos
-                client_nodes = [v for v in graph.vertices() if graph.get_node_type(v) == "client"]
+                client_nodes = list(graph.vertices_by_type("client"))
                 sim.clients = []
                 for idx, node in enumerate(client_nodes):
                     client_id = f"CLI_{idx}"
                     client = sim.generate_clients(client_id=client_id)
-                    client.node_id = node
+                    sim.link_client(client, node)
 
+                # total_orders de cada cliente se actualiza al generar cada orden
                 sim.process_orders(n_orders)
 
-                # Actualizar total_orders de cada cliente
-                for client in sim.clients:
-                    client.total_orders = sum(
-                        1 for order in sim.active_orders + sim.completed_orders
-                        if hasattr(client, "node_id") and order.destination == client.node_id
-                    )
-
                 # Guardar en session state
                 st.session_state.graph = graph
                 st.session_state.sim = sim
                 st.session_state.simulation_generated = True
                 
-                # Calcular layout del grafo
-                nx_graph = NetworkXAdapter.to_networkx(graph)
-                pos = nx.spring_layout(nx_graph, seed=42)
+                # Calcular layout del grafo (cacheado por versión del grafo)
+                pos = NetworkXAdapter.layout(graph)
                 st.session_state.graph_pos = pos
 
                 # ========== CREAR MAPA BASE CON MAPBUILDER ==========
@@ -128,6 +139,7 @@ def run_simulation_tab():
                 # Guardar coordenadas y mapa
                 st.session_state.node_coordinates = coordinates
                 st.session_state.base_map = interactive_map
+                st.session_state.base_map_version = graph.version
 
             st.success("✅ Simulation completed successfully!")
             
@@ -150,6 +162,7 @@ def run_simulation_tab():
         st.subheader("Interactive Map - Temuco")
         
         try:
+            refresh_base_map()
             st.session_state.main_map_data = display_persistent_map(
                 st.session_state.base_map, 
                 "main_map"
@@ -186,7 +199,7 @@ def explore_network_tab():
     nodes = list(graph.vertices())
     
     # Filtrar nodos por tipo
-    warehouse_nodes = [node for node in nodes if graph.get_node_type(node) == "warehouse"]
+    warehouse_nodes = list(graph.vertices_by_type("warehouse"))
     all_nodes = nodes
     
     if not warehouse_nodes:
@@ -244,6 +257,9 @@ def explore_network_tab():
                     st.session_state.last_route = route
                     st.session_state.route_message = f"**Route:** {route.path_str()} | **Cost:** {route.cost:.2f}"
                     st.session_state.route_algorithm = "Dijkstra"
+                    st.session_state.alternative_routes = sim.find_alternative_routes_with_recharge(
+                        origin_node, dest_node, k=4
+                    )
                     
                     coordinates = st.session_state.get('node_coordinates', {})
                     if coordinates:
@@ -286,6 +302,7 @@ def explore_network_tab():
                 "explore_map_with_route"
             )
         elif 'base_map' in st.session_state:
+            refresh_base_map()
             st.session_state.explore_map_data = display_persistent_map(
                 st.session_state.base_map, 
                 "explore_map_base"
@@ -338,13 +355,16 @@ def explore_network_tab():
         
         st.write(" → ".join(route_path_display))
 
+        # ========== RUTAS ALTERNATIVAS ==========
+        alternatives = [alt for alt in st.session_state.get('alternative_routes', [])
+                        if alt.path_str() != route.path_str()]
+        if alternatives:
+            st.subheader("Alternative Routes")
+            for i, alt in enumerate(alternatives[:3], 1):
+                st.write(f"**{i}.** {alt.path_str()} | **Cost:** {alt.cost:.2f}")
+
         # ========== COMPLETAR ORDEN ==========
-        matching_orders = [
-            order for order in sim.active_orders
-            if (str(order.origin) == origin and 
-                str(order.destination) == destination and 
-                order.status != "completed")
-        ]
+        matching_orders = sim.orders_between(route.path[0], route.path[-1])
         
         if matching_orders:
             st.subheader("Complete Order")
@@ -352,28 +372,23 @@ def explore_network_tab():
             
             if st.button("✅ Complete Order", key="complete_order_btn"):
                 try:
-                    sorted_orders = sorted(matching_orders, key=lambda o: getattr(o, "priority", 9999))
+                    # Orden más urgente (menor priority) según el montículo del par
+                    order = sim.orders.most_urgent_between(route.path[0], route.path[-1])
+                    order.route = route
+                    sim.orders.complete(order, route.cost)
                     
-                    for order in sorted_orders:
-                        order.route = route
-                        order.complete(route.cost)
-                        
-                        sim.completed_orders.append(order)
-                        sim.active_orders.remove(order)
-                        
-                        # Insertar ruta en AVL
-                        sim.route_avl.insert(route.path_str(), route)
-                        
-                        st.success("✅ Order completed successfully!")
-                        
-                        # Limpiar estado de ruta
-                        st.session_state.show_route = False
-                        st.session_state.last_route = None
-                        st.session_state.route_message = ""
-                        st.session_state.current_route_map = None
-                        
-                        st.rerun()
-                        break
+                    # Insertar ruta en AVL
+                    sim.route_avl.insert(route.path_str(), route)
+                    
+                    st.success("✅ Order completed successfully!")
+                    
+                    # Limpiar estado de ruta
+                    st.session_state.show_route = False
+                    st.session_state.last_route = None
+                    st.session_state.route_message = ""
+                    st.session_state.current_route_map = None
+                    
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Error completing order: {str(e)}")
         else:
@@ -388,11 +403,11 @@ def explore_network_tab():
         st.metric("Warehouses", warehouse_count)
     
     with col2:
-        client_count = len([n for n in nodes if graph.get_node_type(n) == "client"])
+        client_count = len(graph.vertices_by_type("client"))
         st.metric("Clients", client_count)
     
     with col3:
-        recharge_count = len([n for n in nodes if graph.get_node_type(n) == "recharge"])
+        recharge_count = len(graph.vertices_by_type("recharge"))
         st.metric("Recharge Stations", recharge_count)
 
 def clients_orders_tab():
@@ -422,17 +437,14 @@ def clients_orders_tab():
     # ========== ÓRDENES ==========
     st.subheader("📋 Orders")
     
-    all_orders = []
-    if hasattr(sim, "active_orders"):
-        all_orders.extend([(order, "Active") for order in sim.active_orders])
-    if hasattr(sim, "completed_orders"):
-        all_orders.extend([(order, "Completed") for order in sim.completed_orders])
+    # Vistas del almacén de órdenes (sin copiar las listas)
+    active_orders = sim.orders.active()
+    completed_orders = sim.orders.completed()
     
-    if all_orders:
+    if len(sim.orders):
         tab1, tab2 = st.tabs(["Active Orders", "Completed Orders"])
         
         with tab1:
-            active_orders = [order for order, status in all_orders if status == "Active"]
             if active_orders:
                 for i, order in enumerate(active_orders, 1):
                     with st.expander(f"Active Order {i}"):
@@ -446,7 +458,6 @@ def clients_orders_tab():
                 st.info("No active orders.")
         
         with tab2:
-            completed_orders = [order for order, status in all_orders if status == "Completed"]
             if completed_orders:
                 for i, order in enumerate(completed_orders, 1):
                     with st.expander(f"Completed Order {i}"):
@@ -606,10 +617,7 @@ def general_stats_tab():
     
     # ========== DISTRIBUCIÓN DE NODOS ==========
     st.subheader("🎯 Node Distribution")
-    node_types = {}
-    for node in graph.vertices():
-        node_type = graph.get_node_type(node)
-        node_types[node_type] = node_types.get(node_type, 0) + 1
+    node_types = graph.count_by_type()
     
     if node_types:
         try:
@@ -694,17 +702,16 @@ def main():
         st.sidebar.info("🔍 **Algorithm**: Dijkstra")
         if 'graph' in st.session_state:
             graph = st.session_state.graph
-            st.sidebar.info(f"📊 Nodes: {len(list(graph.vertices()))}")
-            st.sidebar.info(f"🔗 Edges: {len(list(graph.edges()))}")
+            st.sidebar.info(f"📊 Nodes: {graph.num_vertices()}")
+            st.sidebar.info(f"🔗 Edges: {graph.num_edges()}")
             
             sim = st.session_state.sim
-            if hasattr(sim, 'completed_orders'):
-                completed_count = len(sim.completed_orders)
+            if hasattr(sim, 'orders'):
+                completed_count = sim.orders.count('completed')
                 st.sidebar.info(f"✅ Completed Orders: {completed_count}")
                 
-                if hasattr(sim, 'active_orders'):
-                    active_count = len(sim.active_orders)
-                    st.sidebar.info(f"📋 Active Orders: {active_count}")
+                active_count = sim.orders.count('active')
+                st.sidebar.info(f"📋 Active Orders: {active_count}")
     else:
         st.sidebar.warning("⚠️ No Simulation")
     
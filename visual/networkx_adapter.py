@@ -1,10 +1,31 @@
+import weakref
 import networkx as nx
 import matplotlib.pyplot as plt
-from model import Graph
+from model import Graph, GraphChange
 
 class NetworkXAdapter:
+    # Grafo -> (versión, grafo de networkx) y grafo -> (versión, seed, layout)
+    _graph_cache = weakref.WeakKeyDictionary()
+    _layout_cache = weakref.WeakKeyDictionary()
+
     @staticmethod
     def to_networkx(graph):
+        """
+        Convierte el grafo a networkx. El resultado se cachea por versión del
+        grafo y se actualiza con el historial de cambios; no debe modificarse.
+        """
+        cached = NetworkXAdapter._graph_cache.get(graph)
+        if cached is not None:
+            version, nx_graph = cached
+            changes = graph.changes_since(version)
+            if changes is not None and not any(
+                    change.kind == GraphChange.BULK_UPDATE for change in changes):
+                for change in changes:
+                    NetworkXAdapter._apply_change(graph, nx_graph, change)
+                NetworkXAdapter._graph_cache[graph] = (graph.version, nx_graph)
+                return nx_graph
+
+        graph.track_changes()  # Para actualizar la copia con changes_since
         nx_graph = nx.Graph()
         for vertex in graph.vertices():
             node_type = graph.get_node_type(vertex)
@@ -12,8 +33,47 @@ class NetworkXAdapter:
         for edge in graph.edges():
             u, v = edge.endpoints()
             nx_graph.add_edge(str(u), str(v), weight=edge.element())
+        NetworkXAdapter._graph_cache[graph] = (graph.version, nx_graph)
         return nx_graph
 
+    @staticmethod
+    def _apply_change(graph, nx_graph, change):
+        """Aplica un GraphChange al grafo de networkx cacheado"""
+        u = str(change.u)
+        if change.kind == GraphChange.INSERT_VERTEX:
+            nx_graph.add_node(u, type=graph.get_node_type(change.u))
+        elif change.kind == GraphChange.REMOVE_VERTEX:
+            if u in nx_graph:
+                nx_graph.remove_node(u)
+        elif change.kind == GraphChange.REMOVE_EDGE:
+            v = str(change.v)
+            if nx_graph.has_edge(u, v):
+                nx_graph.remove_edge(u, v)
+            # En un grafo dirigido puede quedar la arista en sentido contrario
+            reverse = graph.get_edge(change.v, change.u)
+            if reverse is not None:
+                nx_graph.add_edge(v, u, weight=reverse.element())
+        else:
+            nx_graph.add_edge(u, str(change.v), weight=change.weight)
+
+    @staticmethod
+    def layout(graph, seed=42):
+        """
+        Layout spring del grafo, cacheado por versión. Tras un cambio se
+        recalcula partiendo de las posiciones anteriores.
+        """
+        cached = NetworkXAdapter._layout_cache.get(graph)
+        if cached is not None and cached[0] == graph.version and cached[1] == seed:
+            return cached[2]
+
+        nx_graph = NetworkXAdapter.to_networkx(graph)
+        initial = None
+        if cached is not None:
+            initial = {node: xy for node, xy in cached[2].items() if node in nx_graph}
+        pos = nx.spring_layout(nx_graph, pos=initial or None, seed=seed)
+        NetworkXAdapter._layout_cache[graph] = (graph.version, seed, pos)
+        return pos
+
     @staticmethod
     def draw_graph(graph, highlight_path=None, pos=None):
         nx_graph = NetworkXAdapter.to_networkx(graph)
@@ -31,7 +91,7 @@ class NetworkXAdapter:
 
         # Usar el layout proporcionado o calcular uno nuevo si no hay
         if pos is None:
-            pos = nx.spring_layout(nx_graph, seed=42)
+            pos = NetworkXAdapter.layout(graph)
 
         # Dibuja todos los nodos y aristas en color base
         nx.draw_networkx_nodes(nx_graph, pos, node_color=node_colors)
@@ -59,10 +59,10 @@ class PDFReportGenerator:
                 fontsize=12, ha='center', va='center')
         
         # Estadísticas básicas
-        total_nodes = len(list(self.graph.vertices()))
-        total_edges = len(list(self.graph.edges()))
-        completed_orders = len(self.sim.completed_orders)
-        active_orders = len(self.sim.active_orders)
+        total_nodes = self.graph.num_vertices()
+        total_edges = self.graph.num_edges()
+        completed_orders = self.sim.orders.count('completed')
+        active_orders = self.sim.orders.count('active')
         
         stats_text = f"""RESUMEN EJECUTIVO:
         
@@ -111,10 +111,7 @@ CARACTERÍSTICAS:
         ax1.set_title('Información del Algoritmo', fontweight='bold', fontsize=14)
         
         # Lado derecho: Distribución de tipos de nodo
-        node_types = {}
-        for node in self.graph.vertices():
-            node_type = self.graph.get_node_type(node)
-            node_types[node_type] = node_types.get(node_type, 0) + 1
+        node_types = self.graph.count_by_type()
         
         if node_types:
             colors = ['#ff6b6b', '#00FF00', '#45b7d1', '#96ceb4', '#ffeaa7']